@@ -33,7 +33,7 @@ export function IngestRecipeModal() {
     // Auto-fill from hash fragment (magic link support)
     useEffect(() => {
         const hash = window.location.hash;
-        if (hash && hash.startsWith('#tasteos-v1:')) {
+        if (hash && (hash.startsWith('#tasteos-v1:') || hash.startsWith('#tasteos-v1u:'))) {
             const token = hash.substring(1); // Remove # prefix
             setText(token);
             setIsOpen(true);
@@ -1,19 +1,48 @@
-import json
 import gzip
-import base64
 import hashlib
-from typing import Dict, Any
+import zlib
+from typing import Dict, Any, Optional
 from enum import Enum
 
+import orjson
+import xxhash
+
+from ..settings import settings
+
+try:
+    import pybase64 as _b64
+except ImportError:  # Optional accelerator (SIMD base64); same API as the stdlib module
+    import base64 as _b64
+
+try:
+    import deflate
+except ImportError:  # Optional accelerator (libdeflate); tokens fall back to the gzip module
+    deflate = None
+
 # Supported token versions
-SUPPORTED_VERSIONS = {"v1"}
+SUPPORTED_VERSIONS = {"v1", "v1u"}
 CURRENT_VERSION = "v1"
 PREFIX = f"tasteos-{CURRENT_VERSION}:"
+# v1 layout with the JSON stored uncompressed, used for small payloads
+PREFIX_UNCOMPRESSED = "tasteos-v1u:"
+
+# Below this many JSON bytes gzip costs more than it saves
+COMPRESS_THRESHOLD = 256
 
 # Security limits
 MAX_TOKEN_LENGTH = 100 * 1024  # 100KB base64
 MAX_DECOMPRESSED_SIZE = 1 * 1024 * 1024  # 1MB JSON
 
+def _sha256_hex(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+def _xxh3_hex(data: bytes) -> str:
+    return xxhash.xxh3_64_hexdigest(data)
+
+# Checksum algorithm is identified by its hex length; new tokens use xxh3-64,
+# SHA-256 is only accepted so older tokens keep decoding
+_CHECKSUMS_BY_LENGTH = {16: _xxh3_hex, 64: _sha256_hex}
+
 class TokenError(Exception):
     """Base exception for token-related errors."""
     pass
@@ -33,30 +62,41 @@ class TokenCorruptedError(TokenError):
 def encode_recipe_token(data: Dict[str, Any]) -> str:
     """Compress and encode recipe data into a secure share token.
     
-    Format: tasteos-v1:{sha256_hex}:{base64_gzipped_json}
+    Format: tasteos-v1:{checksum_hex}:{base64_gzipped_json}
     
-    The checksum is computed over the compressed (gzipped) bytes,
+    Payloads under COMPRESS_THRESHOLD bytes skip gzip and use
+    tasteos-v1u:{checksum_hex}:{base64_json} instead.
+    
+    The checksum is computed over the encoded (gzipped or raw) bytes,
     ensuring copy/paste differences don't create false negatives.
+    It is xxh3-64 (16 hex chars); decoders also accept SHA-256 (64 hex
+    chars) from tokens issued before the switch.
     """
     # 1. Compact JSON
-    json_bytes = json.dumps(data, separators=(',', ':')).encode('utf-8')
+    try:
+        json_bytes = orjson.dumps(data)
+    except orjson.JSONEncodeError as e:  # e.g. non-str dict keys, ints wider than 64 bits
+        raise TokenError(f"Recipe data cannot be encoded as JSON: {str(e)}")
     
     # Check size before compression
     if len(json_bytes) > MAX_DECOMPRESSED_SIZE:
         raise TokenTooLargeError(f"Recipe data too large: {len(json_bytes)} bytes (max {MAX_DECOMPRESSED_SIZE})")
     
-    # 2. Gzip compress
-    compressed = gzip.compress(json_bytes, compresslevel=9)
+    # 2. Gzip compress (tiny payloads go uncompressed)
+    if len(json_bytes) < COMPRESS_THRESHOLD:
+        prefix, compressed = PREFIX_UNCOMPRESSED, json_bytes
+    else:
+        prefix, compressed = PREFIX, _gzip_compress(json_bytes)
     
     # 3. Checksum OVER COMPRESSED BYTES (not JSON)
     # This ensures copy/paste doesn't affect validation
-    checksum = hashlib.sha256(compressed).hexdigest()
+    checksum = _xxh3_hex(compressed)
     
     # 4. Base64 encode (URL safe)
-    b64 = base64.urlsafe_b64encode(compressed).decode('ascii')
+    b64 = _b64.urlsafe_b64encode(compressed).decode('ascii')
     
     # 5. Assemble token
-    token = f"{PREFIX}{checksum}:{b64}"
+    token = f"{prefix}{checksum}:{b64}"
     
     # Final size check
     if len(token) > MAX_TOKEN_LENGTH:
@@ -64,9 +104,13 @@ def encode_recipe_token(data: Dict[str, Any]) -> str:
     
     return token
 
-def decode_recipe_token(token: str) -> Dict[str, Any]:
+def decode_recipe_token(token: str, *, verify_checksum: Optional[bool] = None) -> Dict[str, Any]:
     """Decode a share token back into recipe data with comprehensive validation.
     
+    verify_checksum defaults to settings.token_verify_checksum. Pass False only
+    for tokens from a trusted server-to-server path; user-pasted tokens must
+    always be verified.
+    
     Raises:
         TokenVersionError: If token version is unsupported
         TokenTooLargeError: If token exceeds size limits
@@ -87,12 +131,11 @@ def decode_recipe_token(token: str) -> Dict[str, Any]:
             "This doesn't appear to be a valid TasteOS share token."
         )
     
-    # Extract version
-    try:
-        version_end = token.index(":", 8)  # After "tasteos-"
-        version = token[8:version_end]  # Extract version (e.g., "v1")
-    except ValueError:
+    # Split once into [version, checksum, data]; maxsplit stops scanning the payload
+    parts = token[8:].split(":", 2)  # After "tasteos-"
+    if len(parts) == 1:
         raise TokenCorruptedError("Invalid token format: missing version separator")
+    version = parts[0]  # e.g. "v1"
     
     # Validate version
     if version not in SUPPORTED_VERSIONS:
@@ -103,38 +146,39 @@ def decode_recipe_token(token: str) -> Dict[str, Any]:
         )
     
     # 3. Route to version-specific decoder
-    if version == "v1":
-        return _decode_v1_token(token)
+    if verify_checksum is None:
+        verify_checksum = settings.token_verify_checksum
+    
+    if version in ("v1", "v1u"):
+        if len(parts) != 3:
+            raise TokenCorruptedError(
+                "Invalid v1 token format: missing checksum or data section. "
+                "Token may be truncated or corrupted."
+            )
+        return _decode_v1_token(parts[1], parts[2], verify_checksum, gzipped=(version == "v1"))
     
     # Fallback (should never reach due to version check above)
     raise TokenVersionError(f"No decoder available for version: {version}")
 
-def _decode_v1_token(token: str) -> Dict[str, Any]:
-    """Decode a v1 format token.
+def _decode_v1_token(
+    expected_checksum: str, b64: str, verify_checksum: bool = True, gzipped: bool = True
+) -> Dict[str, Any]:
+    """Decode the checksum and data sections of a v1 format token.
     
     Format: tasteos-v1:{checksum}:{base64_data}
+    (or tasteos-v1u:... with uncompressed data when gzipped=False)
     """
-    # Parse token structure
-    token_body = token[len(PREFIX):]
-    parts = token_body.split(':', 1)
-    
-    if len(parts) != 2:
-        raise TokenCorruptedError(
-            "Invalid v1 token format: missing checksum or data section. "
-            "Token may be truncated or corrupted."
-        )
-    
-    expected_checksum, b64 = parts
-    
-    # Validate checksum format (64 hex chars for SHA256)
-    if len(expected_checksum) != 64 or not all(c in '0123456789abcdef' for c in expected_checksum):
-        raise TokenCorruptedError(
-            "Invalid checksum format. Token may be corrupted or modified."
-        )
+    if verify_checksum:
+        # Validate checksum format (16 hex chars for xxh3, 64 for legacy SHA-256)
+        checksum_fn = _CHECKSUMS_BY_LENGTH.get(len(expected_checksum))
+        if checksum_fn is None or not all(c in '0123456789abcdef' for c in expected_checksum):
+            raise TokenCorruptedError(
+                "Invalid checksum format. Token may be corrupted or modified."
+            )
     
     try:
         # Decode base64
-        compressed = base64.urlsafe_b64decode(b64)
+        compressed = _b64.urlsafe_b64decode(b64)
     except Exception as e:
         raise TokenCorruptedError(
             f"Failed to decode token data: {str(e)}. "
@@ -143,8 +187,7 @@ def _decode_v1_token(token: str) -> Dict[str, Any]:
     
     # Verify checksum BEFORE decompression (zip-bomb protection)
     # Checksum is computed over compressed bytes
-    actual_checksum = hashlib.sha256(compressed).hexdigest()
-    if actual_checksum != expected_checksum:
+    if verify_checksum and checksum_fn(compressed) != expected_checksum:
         raise TokenCorruptedError(
             "Token integrity check failed: checksum mismatch. "
             "Token has been modified or corrupted in transit."
@@ -152,7 +195,7 @@ def _decode_v1_token(token: str) -> Dict[str, Any]:
     
     # Safe decompression with size limit
     try:
-        json_bytes = _safe_decompress(compressed, MAX_DECOMPRESSED_SIZE)
+        json_bytes = _safe_decompress(compressed, MAX_DECOMPRESSED_SIZE) if gzipped else compressed
     except TokenTooLargeError:
         raise  # Re-raise with original message
     except Exception as e:
@@ -163,28 +206,51 @@ def _decode_v1_token(token: str) -> Dict[str, Any]:
     
     # Parse JSON
     try:
-        return json.loads(json_bytes.decode('utf-8'))
-    except json.JSONDecodeError as e:
+        return orjson.loads(json_bytes)
+    except orjson.JSONDecodeError as e:  # also covers invalid UTF-8
         raise TokenCorruptedError(
             f"Invalid recipe data in token: {str(e)}. "
             f"Token contents are corrupted."
         )
-    except UnicodeDecodeError as e:
-        raise TokenCorruptedError(f"Invalid text encoding in token: {str(e)}")
+
+def _gzip_compress(data: bytes) -> bytes:
+    """One-shot gzip compression, via libdeflate when available."""
+    if deflate is not None:
+        return deflate.gzip_compress(data, 9)
+    return gzip.compress(data, compresslevel=9)
 
 def _safe_decompress(compressed: bytes, max_size: int) -> bytes:
     """Safely decompress gzip data with size limit to prevent zip-bombs."""
+    if deflate is not None:
+        # libdeflate sizes its output buffer from the gzip ISIZE trailer, so
+        # reject oversized payloads before allocating anything. A forged
+        # (smaller) ISIZE just makes decompression fail on the short buffer.
+        if compressed[:2] == b"\x1f\x8b" and len(compressed) >= 18:
+            declared_size = int.from_bytes(compressed[-4:], "little")
+            if declared_size > max_size:
+                raise TokenTooLargeError(
+                    f"Decompressed data too large: {declared_size} bytes (max {max_size}). "
+                    f"This may indicate a corrupted or malicious token."
+                )
+        try:
+            return deflate.gzip_decompress(compressed)
+        except (ValueError, deflate.DeflateError):
+            raise TokenCorruptedError("Invalid compressed data in token")
+    
+    # Stream with an output cap so a zip-bomb never inflates past max_size + 1 bytes
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)  # gzip container
     try:
-        # Decompress and check size
-        decompressed = gzip.decompress(compressed)
-        
-        if len(decompressed) > max_size:
-            raise TokenTooLargeError(
-                f"Decompressed data too large: {len(decompressed)} bytes (max {max_size}). "
-                f"This may indicate a corrupted or malicious token."
-            )
-        
-        return decompressed
-    except gzip.BadGzipFile:
+        decompressed = decompressor.decompress(compressed, max_size + 1)
+    except zlib.error:
         raise TokenCorruptedError("Invalid compressed data in token")
+    
+    if len(decompressed) > max_size:
+        raise TokenTooLargeError(
+            f"Decompressed data too large: more than {max_size} bytes. "
+            f"This may indicate a corrupted or malicious token."
+        )
+    if not decompressor.eof:
+        raise TokenCorruptedError("Invalid compressed data in token: stream is truncated")
+    
+    return decompressed
 
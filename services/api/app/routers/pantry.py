@@ -180,3 +180,20 @@ def get_leftovers(
         models.Leftover.workspace_id == workspace.id,
         models.Leftover.consumed_at.is_(None)
     ).all()
+
+# Registered after the static GET routes so "/use-soon" and "/leftovers" are not captured as ids
+@router.get("/{item_id}", response_model=schemas.PantryItemOut)
+def get_pantry_item(
+    item_id: str,
+    workspace: models.Workspace = Depends(get_workspace),
+    db: Session = Depends(get_db)
+):
+    """Get a single pantry item."""
+    item = db.query(models.PantryItem).filter(
+        models.PantryItem.id == item_id,
+        models.PantryItem.workspace_id == workspace.id
+    ).first()
+    
+    if not item:
+        raise HTTPException(status_code=404, detail="Pantry item not found")
+    return item
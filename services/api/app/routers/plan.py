@@ -2,7 +2,7 @@
 from datetime import date, timedelta, datetime
 from typing import Optional, List, Any, Dict
 from fastapi import APIRouter, Depends, HTTPException, Query, Header, Body
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 from pydantic import BaseModel
 
 from ..db import get_db
@@ -182,7 +182,9 @@ def get_current_plan(
 
     # print(f"DEBUG: Get current plan for workspace {workspace.id}. Target Week={monday}")
     
-    plan = db.query(MealPlan).filter(
+    plan = db.query(MealPlan).options(
+        selectinload(MealPlan.entries).selectinload(MealPlanEntry.recipe)
+    ).filter(
         MealPlan.workspace_id == workspace.id,
         MealPlan.week_start == monday
     ).order_by(MealPlan.id.desc()).first()
@@ -355,9 +357,9 @@ def enrich_entry(entry: MealPlanEntry, db: Session) -> MealPlanEntryOut:
     title = None
     total_minutes = None
     if entry.recipe_id:
-        # Optimize: could allow eager loading in main query
-        # But lazy for MVP is fine
-        recipe = db.query(Recipe).filter(Recipe.id == entry.recipe_id).first()
+        # Relationship access: served from selectinload / the identity map when
+        # available instead of one SELECT per entry.
+        recipe = entry.recipe
         if recipe:
             title = recipe.title
             total_minutes = recipe.total_minutes or recipe.time_minutes
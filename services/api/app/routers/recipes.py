@@ -37,7 +37,7 @@ from ..services.events import log_event
 from ..services.storage import storage
 from ..services.time_estimate import estimate_recipe_time
 from ..services.ai_service import AIService
-from sqlalchemy import desc, select, func, text, or_
+from sqlalchemy import desc, select, func, text, or_, true
 from pydantic import BaseModel
 
 router = APIRouter()
@@ -644,9 +644,10 @@ async def ingest_recipe(
         from ..parsing import decode_recipe_token
         
         # Check if text is a token
-        if payload.text.strip().startswith("tasteos-v1:"):
+        if payload.text.strip().startswith(("tasteos-v1:", "tasteos-v1u:")):
             try:
-                data = decode_recipe_token(payload.text.strip())
+                # User-pasted, so always verified regardless of settings.token_verify_checksum
+                data = decode_recipe_token(payload.text.strip(), verify_checksum=True)
                 # Convert dict back to PortableRecipe validation?
                 # Ideally we reuse the IMPORT logic now.
                 # But IngestService expects text.
@@ -833,6 +834,27 @@ class TagCount(BaseModel):
 class NotesTagsResponse(BaseModel):
     tags: list[TagCount]
 
+def _note_tag_counts_stmt(recipe_id: str, workspace_id: str):
+    """Tag counts for a recipe's live notes (Postgres only: tags is a text[] column).
+
+    Grouped in SQL via a lateral unnest:
+    select t.tag, count(*) from recipe_note_entries join lateral unnest(tags) as t(tag) on true ... group by t.tag
+    """
+    tag = func.unnest(RecipeNoteEntry.tags).table_valued("tag").render_derived(name="t").lateral()
+    count = func.count().label("count")
+    return (
+        select(tag.c.tag, count)
+        .select_from(RecipeNoteEntry)
+        .join(tag, true())
+        .where(
+            RecipeNoteEntry.recipe_id == recipe_id,
+            RecipeNoteEntry.workspace_id == workspace_id,
+            RecipeNoteEntry.deleted_at.is_(None)
+        )
+        .group_by(tag.c.tag)
+        .order_by(count.desc(), tag.c.tag)
+    )
+
 @router.get("/recipes/{recipe_id}/notes/tags", response_model=NotesTagsResponse)
 def get_recipe_note_tags(
     recipe_id: str,
@@ -844,20 +866,7 @@ def get_recipe_note_tags(
     if not recipe:
         raise HTTPException(status_code=404, detail="Recipe not found")
         
-    # Postgres specific array aggregation
-    # select unnest(tags) as tag, count(*) as count from recipe_note_entries ... group by tag
-    stmt = (
-        select(func.unnest(RecipeNoteEntry.tags).label("tag"), func.count().label("count"))
-        .where(
-            RecipeNoteEntry.recipe_id == recipe_id,
-            RecipeNoteEntry.workspace_id == workspace.id,
-            RecipeNoteEntry.deleted_at.is_(None)
-        )
-        .group_by("tag")
-        .order_by(text("count DESC"))
-    )
-    
-    results = db.execute(stmt).all()
+    results = db.execute(_note_tag_counts_stmt(recipe_id, workspace.id)).all()
     return {"tags": [{"tag": r.tag, "count": r.count} for r in results]}
 
 
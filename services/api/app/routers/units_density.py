@@ -12,6 +12,12 @@ from ..services.unit_conversion import get_unit_info, normalize_unit, calculate_
 
 router = APIRouter()
 
+# Sane density range in g/ml
+# Water = 1.0.  Lead = 11.0.  Balsa wood = 0.16.  Aerogel = 0.00something.
+# Flour ~ 0.5-0.6. Sugar ~ 0.8. Salt ~ 1.2.
+MIN_DENSITY = 0.05
+MAX_DENSITY = 5.0
+
 @router.get("/densities", response_model=IngredientDensityListResponse)
 def list_densities(
     query: Optional[str] = None,
@@ -56,12 +62,10 @@ def upsert_density(
     if g_per_ml is None:
          raise HTTPException(status_code=400, detail="Invalid units (must be one mass and one volume unit)")
     
-    # Validate sane range (0.05 to 5.0)
-    # Water = 1.0.  Lead = 11.0.  Balsa wood = 0.16.  Aerogel = 0.00something.
-    # Flour ~ 0.5-0.6. Sugar ~ 0.8. Salt ~ 1.2.
-    if not (0.05 <= g_per_ml <= 5.0):
+    # Validate sane range
+    if not (MIN_DENSITY <= g_per_ml <= MAX_DENSITY):
         # Allow forceful override via a query param in future if needed, but for now block insane values
-        raise HTTPException(status_code=400, detail="Density out of sane range (0.05 - 5.0 g/ml)")
+        raise HTTPException(status_code=400, detail=f"Density out of sane range ({MIN_DENSITY} - {MAX_DENSITY} g/ml)")
 
     # 3. Check existing
     existing = db.execute(
@@ -5,6 +5,8 @@ Handles mass, volume, and count based conversions with intelligent density looku
 """
 
 import re
+from bisect import bisect_right
+from functools import lru_cache
 from typing import Optional, Tuple, Literal
 
 # --- Types ---
@@ -152,6 +154,18 @@ DENSITY_DB = {
     "morton salt": 0.96,
 }
 
+# Smart unit selection: (target system, unit type) -> (bounds, units, bound unit size)
+# A base quantity below bounds[i] picks units[i]; at or above the last bound
+# picks units[-1]. Bounds are in multiples of bound_unit_size base units (g/ml).
+SMART_UNIT_THRESHOLDS = {
+    ("metric", "volume"): ((1000,), ("ml", "l"), 1.0),
+    ("metric", "mass"): ((1000,), ("g", "kg"), 1.0),
+    # 1 tsp ~ 5ml, 1 tbsp ~ 15ml, 1 cup ~ 240ml, 1 qt ~ 950ml, 1 gal ~ 3800ml
+    ("us_customary", "volume"): ((15, 60, 950, 3800), ("tsp", "tbsp", "cup", "qt", "gal"), 1.0),
+    # Bounds in oz
+    ("us_customary", "mass"): ((16,), ("oz", "lb"), 28.3495),
+}
+
 # Synonyms map for input normalization
 SYNONYMS = {
     "t": "tsp",
@@ -162,31 +176,25 @@ SYNONYMS = {
 
 # --- Core Functions ---
 
+# Every accepted spelling -> key in UNITS_DB, flattened once at import.
+# Later sources win: plural forms < direct units < synonyms, matching the
+# precedence of the original step-by-step lookup.
+_UNIT_CANON = {f"{u}s": u for u in UNITS_DB if f"{u}s" not in UNITS_DB}
+_UNIT_CANON.update({u: u for u in UNITS_DB})
+_UNIT_CANON.update(SYNONYMS)
+
 def normalize_unit(unit: str) -> Optional[str]:
     """Normalize unit string to key in UNITS_DB."""
     if not unit:
         return None
     
-    # 1. Check strict case synonyms (e.g. 'T' vs 't')
-    raw_clean = unit.strip().rstrip('.')
-    if raw_clean in SYNONYMS:
-        return SYNONYMS[raw_clean]
-        
-    u = raw_clean.lower()
+    canon = _UNIT_CANON.get(unit)
+    if canon:
+        return canon
     
-    # Check direct
-    if u in UNITS_DB:
-        return u
-        
-    # Check synonyms
-    if u in SYNONYMS:
-        return SYNONYMS[u]
-        
-    # Check plural s removal
-    if u.endswith('s') and u[:-1] in UNITS_DB:
-        return u[:-1]
-        
-    return None
+    # Case-sensitive first (e.g. 'T' vs 't'), then lowercase
+    raw_clean = unit.strip().rstrip('.')
+    return _UNIT_CANON.get(raw_clean) or _UNIT_CANON.get(raw_clean.lower())
 
 def get_unit_info(unit: str) -> Tuple[UnitType, float]:
     """Get type and factor for a normalized unit."""
@@ -268,82 +276,84 @@ def convert_unit(
     """
     Convert quantity between units.
     """
+    kind, factor_from, factor_to, density, unit, confidence, note, is_approx = _resolve_conversion(
+        from_unit, to_unit, ingredient_name, allow_cross_type, override_density
+    )
+    
+    if kind is None:
+        return ConversionResult(qty, unit, confidence, note, is_approx=is_approx)
+    
+    # Base conversion:
+    # base_qty = qty * factor_from (g or ml)
+    # target_qty = base_qty / factor_to
+    base_qty = qty * factor_from
+    
+    # Mass (g) = Volume (ml) * Density (g/ml)
+    # Volume (ml) = Mass (g) / Density (g/ml)
+    if kind == "mass_to_volume":
+        base_qty = base_qty / density # ml
+    elif kind == "volume_to_mass":
+        base_qty = base_qty * density # g
+    
+    return ConversionResult(base_qty / factor_to, unit, confidence, note=note, is_approx=is_approx)
+
+@lru_cache(maxsize=4096)
+def _resolve_conversion(
+    from_unit: str,
+    to_unit: str,
+    ingredient_name: str,
+    allow_cross_type: bool,
+    override_density: Optional[float]
+) -> Tuple[Optional[str], float, float, float, str, str, Optional[str], bool]:
+    """
+    Resolve everything about a conversion except the quantity itself.
+    
+    Returns (kind, factor_from, factor_to, density, unit, confidence, note, is_approx).
+    kind is None when no conversion applies and the quantity passes through.
+    Workspace density overrides are part of the key, so no invalidation is needed.
+    """
     norm_from = normalize_unit(from_unit)
     norm_to = normalize_unit(to_unit)
     
     if not norm_from or not norm_to:
-        return ConversionResult(qty, to_unit, "low", "Unknown unit", is_approx=True)
+        return None, 1.0, 1.0, 1.0, to_unit, "low", "Unknown unit", True
 
     type_from, factor_from = get_unit_info(norm_from)
     type_to, factor_to = get_unit_info(norm_to)
     
     # Case 1: Same type (Mass->Mass, Vol->Vol)
     if type_from == type_to and type_from != "unknown":
-        # Base conversion: 
-        # base_qty = qty * factor_from
-        # target_qty = base_qty / factor_to
-        base_qty = qty * factor_from
-        result_qty = base_qty / factor_to
-        return ConversionResult(result_qty, norm_to, "high")
+        return "same", factor_from, factor_to, 1.0, norm_to, "high", None, False
         
     # Case 2: Cross type (Mass <-> Vol)
     if {type_from, type_to} == {"mass", "volume"}:
-        density = 1.0
-        confidence = "none"
-        is_override = False
-
         if override_density:
             density = override_density
             confidence = "high"
             is_override = True
         else:
             density, confidence = estimate_density(ingredient_name)
+            is_override = False
         
         if confidence == "none" and not allow_cross_type:
-             return ConversionResult(qty, norm_to, "low", "Cannot convert mass to volume without density", is_approx=True)
-             
-        # Conversion logic:
-        # Mass (g) = Volume (ml) * Density (g/ml)
-        # Volume (ml) = Mass (g) / Density (g/ml)
+             return None, 1.0, 1.0, 1.0, norm_to, "low", "Cannot convert mass to volume without density", True
         
-        base_qty_from = qty * factor_from # g or ml
-        
-        result_base_to = 0.0
-        
-        if type_from == "mass": # g -> ml
-            # V = M / D
-            result_base_to = base_qty_from / density # ml
-        else: # ml -> g
-            # M = V * D
-            result_base_to = base_qty_from * density # g
-            
-        result_qty = result_base_to / factor_to
+        kind = "mass_to_volume" if type_from == "mass" else "volume_to_mass"
         
         if is_override:
             note_text = f"Using density override: {density:.3g} g/ml"
             is_approx = False
-            confidence = "high"
         else:
             note_text = "Uses common cooking density defaults — set an override for precision."
             is_approx = True
-            # If estimate_density gave us 'medium' (exact match), stick with it. 
-            # If 'low' (substring), also stick with it but maybe warn?
-            # User request: "For anything from this list, mark conversions as: confidence: medium"
-            if confidence == "medium":
-                confidence = "medium"
-            # If it was low/none, it remains so
+            # Generic table hits keep the confidence estimate_density gave them
+            # ("medium" for exact matches, "low"/"none" otherwise).
         
-        return ConversionResult(
-            result_qty, 
-            norm_to, 
-            confidence, 
-            note=note_text,
-            is_approx=is_approx
-        )
+        return kind, factor_from, factor_to, density, norm_to, confidence, note_text, is_approx
 
     # Case 3: Incompatible (Count <-> Mass/Vol)
     # Cannot do without "avg weight per item" database which is huge.
-    return ConversionResult(qty, to_unit, "low", "Cannot convert count to measurement", is_approx=True)
+    return None, 1.0, 1.0, 1.0, to_unit, "low", "Cannot convert count to measurement", True
 
 def auto_select_unit(qty: float, current_unit: str, target_system: str = "metric") -> str:
     """
@@ -356,38 +366,9 @@ def auto_select_unit(qty: float, current_unit: str, target_system: str = "metric
         
     u_type, factor = get_unit_info(norm_u)
     
-    # 1. Metric Logic
-    if target_system == "metric":
-        if u_type == "volume":
-            base_ml = qty * factor
-            if base_ml >= 1000: return "l"
-            return "ml"
-        elif u_type == "mass":
-            base_g = qty * factor
-            if base_g >= 1000: return "kg"
-            return "g"
-            
-    # 2. US Customary Logic
-    elif target_system == "us_customary":
-        if u_type == "volume":
-            base_ml = qty * factor
-            # 1 tsp ~ 5ml
-            # 1 tbsp ~ 15ml
-            # 1 cup ~ 240ml
-            # 1 qt ~ 950ml
-            # 1 gal ~ 3800ml
-            
-            if base_ml < 15: return "tsp" # < 1 tbsp
-            if base_ml < 60: return "tbsp" # < 1/4 cup
-            if base_ml < 950: return "cup" # < 1 qt
-            if base_ml < 3800: return "qt" # < 1 gal
-            return "gal"
-            
-        elif u_type == "mass":
-            base_g = qty * factor
-            base_oz = base_g / 28.3495
-            
-            if base_oz >= 16: return "lb"
-            return "oz"
-
-    return current_unit
+    table = SMART_UNIT_THRESHOLDS.get((target_system, u_type))
+    if table is None:
+        return current_unit
+    
+    bounds, units, bound_unit_size = table
+    return units[bisect_right(bounds, qty * factor / bound_unit_size)]
@@ -25,6 +25,10 @@ class Settings(BaseSettings):
     # Local Storage
     media_root: str = "media"
 
+    # Share tokens: set TOKEN_VERIFY_CHECKSUM=false only when every token comes
+    # from a trusted source over an integrity-protected transport (e.g. TLS)
+    token_verify_checksum: bool = True
+
     # Object store (S3-compatible)
     object_store_endpoint: str = "http://localhost:9000"
     object_store_region: str = "auto"
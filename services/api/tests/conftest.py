@@ -1,8 +1,12 @@
 import os
 import tempfile
+from types import SimpleNamespace
+import httpx
+import orjson
 import pytest
+import pytest_asyncio
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 import sqlite3
@@ -55,6 +59,17 @@ engine = create_engine(
     },
     poolclass=StaticPool # Important for in-memory to share connection across threads/sessions if needed
 )
+
+# pysqlite's implicit BEGIN handling breaks SAVEPOINT; let SQLAlchemy emit BEGIN itself
+# so each test can run inside an outer transaction that is rolled back afterwards.
+@event.listens_for(engine, "connect")
+def _sqlite_disable_implicit_begin(dbapi_connection, connection_record):
+    dbapi_connection.isolation_level = None
+
+@event.listens_for(engine, "begin")
+def _sqlite_emit_begin(conn):
+    conn.exec_driver_sql("BEGIN")
+
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 def override_get_db():
@@ -64,6 +79,9 @@ def override_get_db():
     finally:
         db.close()
 
+# Installed once at import; per-test changes are rolled back by `dependency_overrides`.
+app.dependency_overrides[get_db] = override_get_db
+
 @pytest.fixture(autouse=True, scope="session")
 def _set_test_env():
     # Use a temp SQLite file for unit tests (stable across connections).
@@ -74,20 +92,76 @@ def _set_test_env():
     os.environ["AI_MODE"] = "mock"
     yield
 
-@pytest.fixture(autouse=True)
+@pytest.fixture(autouse=True, scope="session")
 def setup_database():
-    """Create tables before each test, drop after."""
+    """Create tables once for the whole test session."""
     Base.metadata.create_all(bind=engine)
     yield
     Base.metadata.drop_all(bind=engine)
 
-@pytest.fixture
+@pytest.fixture(scope="session")
+def db_connection(setup_database):
+    """Connection holding an outer transaction for the whole session; never committed.
+
+    Sessions join it through a SAVEPOINT, so commits made by tests or by the app
+    stay visible on this connection but never persist.
+    """
+    connection = engine.connect()
+    trans = connection.begin()
+    TestingSessionLocal.configure(bind=connection, join_transaction_mode="create_savepoint")
+    yield connection
+    TestingSessionLocal.configure(bind=engine, join_transaction_mode="conservative_savepoint")
+    trans.rollback()
+    connection.close()
+
+@pytest.fixture(autouse=True)
+def db_transaction(db_connection):
+    """Run each test inside a SAVEPOINT that is rolled back on teardown.
+
+    Module-scoped fixtures can take their own savepoint on ``db_connection`` to
+    share seeded rows across a module; test savepoints nest inside it.
+    """
+    savepoint = db_connection.begin_nested()
+    yield db_connection
+    savepoint.rollback()
+
+@pytest.fixture(autouse=True)
+def dependency_overrides():
+    """Restore app.dependency_overrides after each test so per-test overrides don't leak.
+
+    The get_db override installed at import is left alone; the dict is only
+    rewritten when a test actually changed it.
+    """
+    saved = dict(app.dependency_overrides)
+    yield app.dependency_overrides
+    if app.dependency_overrides != saved:
+        app.dependency_overrides.clear()
+        app.dependency_overrides.update(saved)
+
+@pytest.fixture(scope="session")
 def client():
-    """Test client with DB override."""
-    app.dependency_overrides[get_db] = override_get_db
+    """Test client shared across the session; DB override is installed at import."""
     with TestClient(app) as c:
         yield c
-    app.dependency_overrides.clear()
+
+@pytest.fixture(scope="session")
+def orjson_io():
+    """orjson helpers for tests that send pre-serialized bodies as raw content.
+
+    ``load(response)`` decodes a response body with orjson instead of httpx's
+    stdlib json; ``headers`` is the content-type header to send with the body.
+    """
+    return SimpleNamespace(
+        load=lambda response: orjson.loads(response.content),
+        headers={"content-type": "application/json"},
+    )
+
+@pytest_asyncio.fixture
+async def async_client():
+    """In-process ASGI client for async tests (no portal thread hop per request)."""
+    # Follow redirects like TestClient does (e.g. "/api/workspaces/" -> "/api/workspaces")
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test", follow_redirects=True) as c:
+        yield c
 
 @pytest.fixture
 def db_session():
@@ -102,8 +176,9 @@ def workspace(db_session):
     # Use a valid UUID to ensure compatibility with GUID types
     ws = Workspace(id="00000000-0000-0000-0000-000000000000", slug="test", name="Test Workspace")
     db_session.add(ws)
-    db_session.commit()
-    db_session.refresh(ws)
+    # The id is assigned client-side, so a flush is enough: request sessions share
+    # db_connection and see the row, and the test savepoint discards it
+    db_session.flush()
     return ws
 
 import fakeredis
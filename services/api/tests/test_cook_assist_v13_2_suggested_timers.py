@@ -47,12 +47,13 @@ def test_generate_suggestions_regex():
     # Expect 2 suggestions: 30 mins (Bake) and 10 mins (Cool)
     assert len(suggestions) == 2
     
-    s1 = next((s for s in suggestions if s.duration_s == 1800), None)
+    by_duration = {s.duration_s: s for s in suggestions}
+    s1 = by_duration.get(1800)
     assert s1 is not None
     assert s1.label == "Bake" # From title or keyword
     assert "text_regex" in s1.reason
     
-    s2 = next((s for s in suggestions if s.duration_s == 600), None)
+    s2 = by_duration.get(600)
     assert s2 is not None
     assert s2.label == "Cool" # From keyword in bullet
     assert "text_regex" in s2.reason
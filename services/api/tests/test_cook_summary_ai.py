@@ -37,12 +37,11 @@ def test_summary_polish_logic():
         assert "Method: test" in result.bullets
 
 from app.deps import get_workspace
-from app.main import app
 
-def test_notes_preview_uses_ai_result(client, workspace, db_session):
+def test_notes_preview_uses_ai_result(client, workspace, db_session, dependency_overrides):
     # Override get_workspace to bypass DB lookup issues in test env
-    # Note: client fixture sets overrides, so we update them
-    app.dependency_overrides[get_workspace] = lambda: workspace
+    # Note: the dependency_overrides fixture restores the overrides after the test
+    dependency_overrides[get_workspace] = lambda: workspace
 
     # Setup Data
     r = Recipe(id=uuid.uuid4().hex, workspace_id=workspace.id, title="Test Recipe")
@@ -7,6 +7,7 @@ from unittest.mock import patch
 from app.models import Recipe, RecipeIngredient, MealPlan, MealPlanEntry, Leftover
 
 def test_overrides_and_meta(client, workspace, db_session):
+    today = date.today()
     # 1. Setup Recipes
     r_todo = Recipe(workspace_id=workspace.id, title="Classic Dish", servings=4, 
                     ingredients=[RecipeIngredient(name="Beef", qty=1, unit="kg")])
@@ -29,19 +30,19 @@ def test_overrides_and_meta(client, workspace, db_session):
     db_session.commit()
 
     # 3. Setup Meal Plan
-    mp = MealPlan(workspace_id=workspace.id, week_start=date.today(), settings_json={})
+    mp = MealPlan(workspace_id=workspace.id, week_start=today, settings_json={})
     db_session.add(mp)
     db_session.commit()
     
     # Entries
     # 1. Planned leftover (explicit) -> Should Skip
-    e_planned_lo = MealPlanEntry(meal_plan_id=mp.id, recipe_id=r_planned_lo.id, date=date.today(), meal_type="lunch", is_leftover=True)
+    e_planned_lo = MealPlanEntry(meal_plan_id=mp.id, recipe_id=r_planned_lo.id, date=today, meal_type="lunch", is_leftover=True)
     
     # 2. Active leftover (full) -> Should Skip
-    e_active_lo = MealPlanEntry(meal_plan_id=mp.id, recipe_id=r_active_lo.id, date=date.today(), meal_type="dinner")
+    e_active_lo = MealPlanEntry(meal_plan_id=mp.id, recipe_id=r_active_lo.id, date=today, meal_type="dinner")
     
     # 3. Partial leftover -> Should Include but Reduce
-    e_partial = MealPlanEntry(meal_plan_id=mp.id, recipe_id=r_partial.id, date=date.today(), meal_type="dinner")
+    e_partial = MealPlanEntry(meal_plan_id=mp.id, recipe_id=r_partial.id, date=today, meal_type="dinner")
     
     # 4. Forced cook (simulating manual override on active leftover)
     # We'll use a new recipe for this to verify force_cook
@@ -51,7 +52,7 @@ def test_overrides_and_meta(client, workspace, db_session):
     db_session.add_all([r_forced, lo_forced])
     db_session.commit()
     
-    e_forced = MealPlanEntry(meal_plan_id=mp.id, recipe_id=r_forced.id, date=date.today(), meal_type="dinner", force_cook=True)
+    e_forced = MealPlanEntry(meal_plan_id=mp.id, recipe_id=r_forced.id, date=today, meal_type="dinner", force_cook=True)
     
     db_session.add_all([e_planned_lo, e_active_lo, e_partial, e_forced])
     db_session.commit()
@@ -62,7 +63,7 @@ def test_overrides_and_meta(client, workspace, db_session):
         mock_gen.return_value.id = str(uuid.uuid4())
         mock_gen.return_value.items = []
         mock_gen.return_value.source = "test"
-        mock_gen.return_value.created_at = date.today()
+        mock_gen.return_value.created_at = today
         
         # --- Test 1: Default Generation with Meta ---
         resp = client.post("/api/grocery/generate", json={"plan_id": mp.id})
@@ -101,7 +102,7 @@ def test_overrides_and_meta(client, workspace, db_session):
         mock_gen.return_value.id = "mock"
         mock_gen.return_value.items = []
         mock_gen.return_value.source = "test"
-        mock_gen.return_value.created_at = date.today()
+        mock_gen.return_value.created_at = today
         
         resp2 = client.post("/api/grocery/generate", json={
             "plan_id": mp.id, 
@@ -110,7 +111,7 @@ def test_overrides_and_meta(client, workspace, db_session):
         meta2 = resp2.json()["meta"]
         
         # Active LO should now be included
-        skipped_ids = [item["recipe_id"] for item in meta2["skipped_entries"]]
+        skipped_ids = {item["recipe_id"] for item in meta2["skipped_entries"]}
         assert r_active_lo.id not in skipped_ids
         
         # Call args check
@@ -122,7 +123,7 @@ def test_overrides_and_meta(client, workspace, db_session):
         mock_gen.return_value.id = "mock"
         mock_gen.return_value.items = []
         mock_gen.return_value.source = "test"
-        mock_gen.return_value.created_at = date.today()
+        mock_gen.return_value.created_at = today
 
         resp3 = client.post("/api/grocery/generate", json={
             "plan_id": mp.id,
@@ -130,7 +131,7 @@ def test_overrides_and_meta(client, workspace, db_session):
         })
         meta3 = resp3.json()["meta"]
         
-        skipped_ids = [item["recipe_id"] for item in meta3["skipped_entries"]]
+        skipped_ids = {item["recipe_id"] for item in meta3["skipped_entries"]}
         
         # Active LO should be included because we ignore leftovers in fridge
         assert r_active_lo.id not in skipped_ids 
@@ -79,13 +79,12 @@ async def test_idempotency_flow(fake_redis):
 
 # --- Integration Test with DB and Client ---
 
-def test_note_creation_idempotency(client, db_session, workspace):
+def test_note_creation_idempotency(client, db_session, workspace, dependency_overrides):
     """Verify that calling the API twice creates only one note."""
     
     # Force client to use the same DB session to avoid SQLite isolation issues
     from app.db import get_db
-    from app.main import app
-    app.dependency_overrides[get_db] = lambda: db_session
+    dependency_overrides[get_db] = lambda: db_session
 
     # Create fake recipe in DB
     from app.models import Recipe, RecipeNoteEntry
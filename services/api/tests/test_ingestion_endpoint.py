@@ -1,10 +1,6 @@
-from fastapi.testclient import TestClient
-from app.main import app
 from app.parsing import RuleBasedParser
 
-client = TestClient(app)
-
-def test_ingest_endpoint(db_session, workspace):
+def test_ingest_endpoint(client, db_session, workspace):
     # Mock workspace context is handled by dependency override in conftest usually
     # Assuming workspace fixture provides a workspace and overrides get_workspace
     
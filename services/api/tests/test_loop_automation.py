@@ -1,6 +1,7 @@
 import pytest
 import uuid
 from datetime import datetime, timedelta
+from sqlalchemy import func, select
 from app.models import GroceryList, GroceryListItem, PantryItem
 
 def test_grocery_purchase_sync_to_pantry(client, db_session, workspace):
@@ -42,7 +43,7 @@ def test_grocery_purchase_sync_to_pantry(client, db_session, workspace):
     resp2 = client.patch(f"/api/grocery/items/{item_id}", json={"status": "purchased"}, headers=headers)
     assert resp2.status_code == 200
     
-    count = db_session.query(PantryItem).filter(PantryItem.name == "Milk").count()
+    count = db_session.scalar(select(func.count()).select_from(PantryItem).where(PantryItem.name == "Milk"))
     assert count == 1
 
 def test_pantry_use_soon(client, db_session, workspace):
@@ -84,7 +85,7 @@ def test_pantry_use_soon(client, db_session, workspace):
     assert resp.status_code == 200
     items = resp.json()
     
-    names = [i["name"] for i in items]
+    names = {i["name"] for i in items}
     assert "Spinach" in names
     assert "Leftover Pizza" in names
     assert "Canned Beans" not in names
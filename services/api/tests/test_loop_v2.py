@@ -3,9 +3,10 @@ import uuid
 from datetime import date
 from decimal import Decimal
 from app.models import Recipe, RecipeIngredient, MealPlan, MealPlanEntry, CookSession, Leftover, PantryItem, PantryTransaction
-from sqlalchemy import select
+from sqlalchemy import func, select
 
 def test_auto_leftover_on_complete(client, workspace, db_session):
+    today = date.today()
     # 1. Setup Data
     # Recipe
     recipe = Recipe(workspace_id=workspace.id, title="Test Curry", steps=[])
@@ -15,7 +16,7 @@ def test_auto_leftover_on_complete(client, workspace, db_session):
     # Meal Plan Entry (Today)
     mp = MealPlan(
         workspace_id=workspace.id,
-        week_start=date.today(), # simplistic
+        week_start=today, # simplistic
         settings_json={}
     )
     db_session.add(mp)
@@ -23,7 +24,7 @@ def test_auto_leftover_on_complete(client, workspace, db_session):
     
     entry = MealPlanEntry(
         meal_plan_id=mp.id,
-        date=date.today(),
+        date=today,
         meal_type="dinner",
         recipe_id=recipe.id
     )
@@ -66,13 +67,14 @@ def test_auto_leftover_on_complete(client, workspace, db_session):
 
 def test_auto_leftover_dedupe(client, workspace, db_session):
     """Completing twice shouldn't create duplicates."""
+    today = date.today()
     # Setup
     recipe = Recipe(workspace_id=workspace.id, title="Test Curry", steps=[])
     db_session.add(recipe)
-    mp = MealPlan(workspace_id=workspace.id, week_start=date.today(), settings_json={})
+    mp = MealPlan(workspace_id=workspace.id, week_start=today, settings_json={})
     db_session.add(mp)
     db_session.commit()
-    entry = MealPlanEntry(meal_plan_id=mp.id, date=date.today(), meal_type="dinner", recipe_id=recipe.id)
+    entry = MealPlanEntry(meal_plan_id=mp.id, date=today, meal_type="dinner", recipe_id=recipe.id)
     db_session.add(entry)
     session = CookSession(workspace_id=workspace.id, recipe_id=recipe.id, status="active")
     db_session.add(session)
@@ -84,12 +86,13 @@ def test_auto_leftover_dedupe(client, workspace, db_session):
     client.patch(f"/api/cook/session/{session.id}/end?action=complete", headers=headers)
     
     # Count leftovers
-    count1 = db_session.query(Leftover).count()
+    leftover_count = select(func.count()).select_from(Leftover).where(Leftover.plan_entry_id == entry.id)
+    count1 = db_session.scalar(leftover_count)
     
     # Second Complete
     client.patch(f"/api/cook/session/{session.id}/end?action=complete", headers=headers)
     
-    count2 = db_session.query(Leftover).count()
+    count2 = db_session.scalar(leftover_count)
     assert count1 == count2
     
 def test_pantry_decrement_flow(client, workspace, db_session):
@@ -145,9 +148,22 @@ def test_pantry_decrement_flow(client, workspace, db_session):
     assert float(p_rice.qty) == 10.0
     assert txn.undone_at is not None
 
+from types import SimpleNamespace
 from unittest.mock import patch
 
-def test_grocery_respects_leftovers(client, workspace, db_session):
+@pytest.fixture
+def mock_grocery_result():
+    """Canned grocery agent result, dated when the test runs rather than at import."""
+    return SimpleNamespace(
+        id=str(uuid.uuid4()),
+        items=[],
+        markdown="Test List",
+        created_at=date.today(),
+        source="mock-source",
+    )
+
+def test_grocery_respects_leftovers(client, workspace, db_session, mock_grocery_result):
+    today = date.today()
     # 1. Setup Recipes
     r_cook = Recipe(workspace_id=workspace.id, title="Fresh Meal", steps=[])
     r_leftover_plan = Recipe(workspace_id=workspace.id, title="Leftover Lunch", steps=[])
@@ -166,27 +182,23 @@ def test_grocery_respects_leftovers(client, workspace, db_session):
     db_session.commit()
     
     # 3. Setup Plan
-    mp = MealPlan(workspace_id=workspace.id, week_start=date.today(), settings_json={})
+    mp = MealPlan(workspace_id=workspace.id, week_start=today, settings_json={})
     db_session.add(mp)
     db_session.commit()
     
     # Entry 1: To Cook (Should include)
-    e1 = MealPlanEntry(meal_plan_id=mp.id, recipe_id=r_cook.id, date=date.today(), meal_type="dinner")
+    e1 = MealPlanEntry(meal_plan_id=mp.id, recipe_id=r_cook.id, date=today, meal_type="dinner")
     # Entry 2: Planned Leftover (Should exclude)
-    e2 = MealPlanEntry(meal_plan_id=mp.id, recipe_id=r_leftover_plan.id, is_leftover=True, date=date.today(), meal_type="lunch")
+    e2 = MealPlanEntry(meal_plan_id=mp.id, recipe_id=r_leftover_plan.id, is_leftover=True, date=today, meal_type="lunch")
     # Entry 3: To Cook but Active Leftover Exists (Should exclude)
-    e3 = MealPlanEntry(meal_plan_id=mp.id, recipe_id=r_active_leftover.id, date=date.today(), meal_type="dinner")
+    e3 = MealPlanEntry(meal_plan_id=mp.id, recipe_id=r_active_leftover.id, date=today, meal_type="dinner")
     
     db_session.add_all([e1, e2, e3])
     db_session.commit()
     
     # 4. Mock Agent and Call
     with patch("app.routers.grocery.generate_grocery_list") as mock_gen:
-        mock_gen.return_value.id = str(uuid.uuid4())
-        mock_gen.return_value.items = []
-        mock_gen.return_value.markdown = "Test List"
-        mock_gen.return_value.created_at = date.today()
-        mock_gen.return_value.source = "mock-source"
+        mock_gen.return_value = mock_grocery_result
         
         resp = client.post(f"/api/grocery/generate", json={"plan_id": mp.id, "recipe_ids": []})
         assert resp.status_code == 200
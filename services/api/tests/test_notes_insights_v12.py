@@ -1,6 +1,7 @@
 import pytest
 from uuid import uuid4
 from datetime import datetime, timedelta, timezone
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 from app.models import RecipeNoteEntry, Recipe, NoteInsightsCache
 from app.insights.notes_facts import NotesFactsBuilder
@@ -10,22 +11,21 @@ WS_ID = "00000000-0000-0000-0000-000000000000"
 
 @pytest.fixture
 def sample_recipe(db_session, workspace):
-    r = Recipe(
-        workspace_id=workspace.id,
-        title="Test Recipe",
-        created_at=datetime.now(timezone.utc)
-    )
-    db_session.add(r)
+    recipe_id = db_session.execute(
+        insert(Recipe)
+        .values(
+            workspace_id=workspace.id,
+            title="Test Recipe",
+            created_at=datetime.now(timezone.utc)
+        )
+        .returning(Recipe.id)
+    ).scalar_one()
     db_session.commit()
-    db_session.refresh(r)
-    return r
+    return db_session.get(Recipe, recipe_id)
 
 @pytest.fixture
 def seeded_db(db_session, sample_recipe, workspace):
-    # Clear existing notes
-    db_session.query(RecipeNoteEntry).delete()
-    db_session.query(NoteInsightsCache).delete()
-    
+    # Tables start empty: each test runs in a rolled-back transaction (see conftest)
     # Create notes
     # 3x "too_thick" adjustments with "air_fryer" tag
     for i in range(3):
@@ -1,31 +1,29 @@
 import pytest
-from tests.conftest import TestingSessionLocal
+from sqlalchemy.dialects import postgresql
 from app.models import Recipe, RecipeNoteEntry, Workspace
+from app.routers.recipes import _note_tag_counts_stmt
 from datetime import datetime, timedelta
 
 @pytest.fixture
-def db(setup_database):
-    session = TestingSessionLocal()
-    
-    # Ensure tables exist (redundant but safe)
-    from app.db import Base, engine
-    Base.metadata.create_all(bind=engine)
-    
-    yield session
-    session.close()
+def db(db_session):
+    yield db_session
 
-def test_notes_search_workflow(client, db):
+def test_notes_search_workflow(db, client):
+    # Tag filters use ARRAY.contains, which only the Postgres ARRAY type implements
+    if db.get_bind().dialect.name == "sqlite":
+        pytest.skip("notes tag search needs Postgres ARRAY.contains")
+    
     # 1. Setup Data
     workspace_id = "ws-default"
     
     # Create workspace
-    db.add(Workspace(id=workspace_id, name="Default", created_at=datetime.now()))
+    db.add(Workspace(id=workspace_id, slug="default", name="Default", created_at=datetime.now()))
     db.commit()
     
     recipe_id = "test-recipe-123"
     
     # Create Recipe
-    db.add(Recipe(id=recipe_id, workspace_id=workspace_id, title="Test", url="http://x.com", steps=[], ingredients=[]))
+    db.add(Recipe(id=recipe_id, workspace_id=workspace_id, title="Test", steps=[], ingredients=[]))
     # Note 1: Air Fryer, Good
     db.add(RecipeNoteEntry(
         workspace_id=workspace_id,
@@ -89,65 +87,10 @@ def test_notes_search_workflow(client, db):
     assert tag_map['air_fryer'] == 2
     assert tag_map['oven'] == 1
 
-    # Note 1: Air Fryer, Good
-    db.add(RecipeNoteEntry(
-        workspace_id=recipe['workspace_id'],
-        recipe_id=recipe_id,
-        source="manual",
-        title="Air Fryer Attempt",
-        content_md="Cooked in the air fryer using default settings. Good result.",
-        tags=["air_fryer", "good"],
-        created_at=datetime.now()
-    ))
+def test_note_tag_counts_sql_for_postgres():
+    """The tag aggregation only runs on Postgres, so at least check the SQL it compiles to."""
+    sql = " ".join(str(_note_tag_counts_stmt("r1", "ws1").compile(dialect=postgresql.dialect())).split())
     
-    # Note 2: Oven, too salty
-    db.add(RecipeNoteEntry(
-        workspace_id=recipe['workspace_id'],
-        recipe_id=recipe_id,
-        source="manual",
-        title="Oven Attempt",
-        content_md="Used the oven. It was too salty.",
-        tags=["oven", "too_salty"],
-        created_at=datetime.now() - timedelta(days=1)
-    ))
-    
-    # Note 3: Air Fryer, too salty
-    db.add(RecipeNoteEntry(
-        workspace_id=recipe['workspace_id'],
-        recipe_id=recipe_id,
-        source="manual",
-        title="Another Air Fryer",
-        content_md="Air fryer again. Still too salty.",
-        tags=["air_fryer", "too_salty"],
-        created_at=datetime.now() - timedelta(days=2)
-    ))
-    db.commit()
-    
-    # 2. Test Search by Text
-    resp = client.get(f"/api/recipes/{recipe_id}/notes/search?q=salty")
-    assert resp.status_code == 200
-    data = resp.json()
-    assert len(data['items']) == 2
-    assert "too salty" in data['items'][0]['content_md'] or "too salty" in data['items'][0]['title']
-
-    # 3. Test Filter by Tag
-    resp = client.get(f"/api/recipes/{recipe_id}/notes/search?tags=air_fryer")
-    assert resp.status_code == 200
-    data = resp.json()
-    assert len(data['items']) == 2 # Note 1 and 3
-
-    # 4. Test Filter by Multiple Tags (AND)
-    resp = client.get(f"/api/recipes/{recipe_id}/notes/search?tags=air_fryer&tags=too_salty")
-    assert resp.status_code == 200
-    data = resp.json()
-    assert len(data['items']) == 1 # Note 3 only
-    assert data['items'][0]['title'] == "Another Air Fryer"
-
-    # 5. Test Tags Aggregation
-    resp = client.get(f"/api/recipes/{recipe_id}/notes/tags")
-    assert resp.status_code == 200
-    tags = resp.json()['tags']
-    # Expect: air_fryer: 2, too_salty: 2, oven: 1, good: 1
-    tag_map = {t['tag']: t['count'] for t in tags}
-    assert tag_map['air_fryer'] == 2
-    assert tag_map['oven'] == 1
+    assert "FROM recipe_note_entries JOIN LATERAL unnest(recipe_note_entries.tags) AS t_1(tag) ON true" in sql
+    assert "recipe_note_entries.deleted_at IS NULL" in sql
+    assert sql.endswith("GROUP BY t_1.tag ORDER BY count DESC, t_1.tag")
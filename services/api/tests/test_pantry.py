@@ -1,67 +1,16 @@
 
-import os
-import uuid
 import pytest
 from datetime import date, timedelta
-from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-
-from app.main import app
-from app.db import Base, get_db
-from app.models import Workspace, PantryItem, MealPlan, MealPlanEntry
-from app.deps import get_workspace
-
-# --- Test Database Setup ---
-# Use the environment's DATABASE_URL (Postgres)
-SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./test_pantry.db")
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-
-def override_get_db():
-    db = TestingSessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-@pytest.fixture
-def client():
-    """Test client with DB override."""
-    app.dependency_overrides[get_db] = override_get_db
-    with TestClient(app) as c:
-        yield c
-    app.dependency_overrides.clear()
-
-@pytest.fixture
-def db_session():
-    """Direct database session."""
-    session = TestingSessionLocal()
-    try:
-        yield session
-    finally:
-        session.close()
-
-@pytest.fixture
-def workspace(db_session):
-    """Create a unique test workspace and cleanup after."""
-    slug = f"test-pantry-{uuid.uuid4().hex[:8]}"
-    ws = Workspace(name="Test Pantry Workspace", slug=slug)
-    db_session.add(ws)
-    db_session.commit()
-    db_session.refresh(ws)
-    
-    yield ws
-    
-    # Cleanup
-    # Note: ondelete="CASCADE" in models handles related items
-    db_session.delete(ws)
-    db_session.commit()
+
+from app.models import PantryItem, MealPlan, MealPlanEntry, Leftover
+
+# Engine, session, client and workspace fixtures come from conftest.py
 
 # --- Tests ---
 
 def test_create_pantry_item(client, workspace):
     """Create pantry item works."""
+    headers = {"X-Workspace-Id": workspace.id}
     # We need to simulate the workspace header or ensure resolution finds our workspace
     # The 'local' workspace resolution fallback finds first workspace.
     
@@ -77,7 +26,7 @@ def test_create_pantry_item(client, workspace):
     response = client.post(
         "/api/pantry/", 
         json=payload, 
-        headers={"X-Workspace-Id": workspace.id}
+        headers=headers
     )
     assert response.status_code == 201
     data = response.json()
@@ -88,49 +37,44 @@ def test_create_pantry_item(client, workspace):
 
 def test_list_pantry_items(client, workspace):
     """List returns created items."""
+    headers = {"X-Workspace-Id": workspace.id}
     # Create manually
-    client.post("/api/pantry/", json={"name": "Eggs"}, headers={"X-Workspace-Id": workspace.id})
-    client.post("/api/pantry/", json={"name": "Bread"}, headers={"X-Workspace-Id": workspace.id})
+    for name in ("Eggs", "Bread"):
+        client.post("/api/pantry/", json={"name": name}, headers=headers)
     
-    response = client.get("/api/pantry/", headers={"X-Workspace-Id": workspace.id})
+    response = client.get("/api/pantry/", headers=headers)
     assert response.status_code == 200
     data = response.json()
     assert len(data) == 2
-    names = [i["name"] for i in data]
+    names = {i["name"] for i in data}
     assert "Eggs" in names
     assert "Bread" in names
 
 
-def test_use_soon_filter(client, workspace):
+def test_use_soon_filter(client, workspace, db_session):
     """use_soon filter returns only expiring items."""
+    headers = {"X-Workspace-Id": workspace.id}
     today = date.today()
     
-    # 1. Expires tomorrow (Soon)
-    client.post("/api/pantry/", json={
-        "name": "Old Milk", "expires_on": str(today + timedelta(days=1))
-    }, headers={"X-Workspace-Id": workspace.id})
-    
-    # 2. Expires in 4 days (Soon)
-    client.post("/api/pantry/", json={
-        "name": "Yogurt", "expires_on": str(today + timedelta(days=4))
-    }, headers={"X-Workspace-Id": workspace.id})
-    
-    # 3. Expires in 10 days (Not soon)
-    client.post("/api/pantry/", json={
-        "name": "Canned Beans", "expires_on": str(today + timedelta(days=10))
-    }, headers={"X-Workspace-Id": workspace.id})
-    
-    # 4. No expiry (Not soon)
-    client.post("/api/pantry/", json={
-        "name": "Salt"
-    }, headers={"X-Workspace-Id": workspace.id})
+    # Seed directly; only the use_soon listing below is under test
+    db_session.add_all([
+        # 1. Expires tomorrow (Soon)
+        PantryItem(workspace_id=workspace.id, name="Old Milk", expires_on=today + timedelta(days=1)),
+        # 2. Expires in 4 days (Soon)
+        PantryItem(workspace_id=workspace.id, name="Yogurt", expires_on=today + timedelta(days=4)),
+        # 3. Expires in 10 days (Not soon)
+        PantryItem(workspace_id=workspace.id, name="Canned Beans", expires_on=today + timedelta(days=10)),
+        # 4. No expiry (Not soon)
+        PantryItem(workspace_id=workspace.id, name="Salt"),
+    ])
+    db_session.commit()
     
-    response = client.get("/api/pantry/?use_soon=1", headers={"X-Workspace-Id": workspace.id})
+    response = client.get("/api/pantry/?use_soon=1", headers=headers)
     assert response.status_code == 200
     data = response.json()
     
     assert len(data) == 2
-    names = [i["name"] for i in data]
+    names = {i["name"] for i in data}
     assert "Old Milk" in names
     assert "Yogurt" in names
     assert "Canned Beans" not in names
@@ -139,17 +83,18 @@ def test_use_soon_filter(client, workspace):
 
 def test_update_pantry_item(client, workspace):
     """Update item fields."""
+    headers = {"X-Workspace-Id": workspace.id}
     res = client.post(
         "/api/pantry/", 
         json={"name": "Apples", "qty": 5}, 
-        headers={"X-Workspace-Id": workspace.id}
+        headers=headers
     )
     item_id = res.json()["id"]
     
     res = client.patch(
         f"/api/pantry/{item_id}",
         json={"qty": 3, "notes": "Ate two"},
-        headers={"X-Workspace-Id": workspace.id}
+        headers=headers
     )
     assert res.status_code == 200
     data = res.json()
@@ -157,55 +102,57 @@ def test_update_pantry_item(client, workspace):
     assert data["notes"] == "Ate two"
     assert data["name"] == "Apples"  # Unchanged
 
+    # Persisted: fetch the one row by id rather than listing the pantry
+    assert client.get(f"/api/pantry/{item_id}", headers=headers).json()["qty"] == 3.0
+
 
 def test_delete_pantry_item(client, workspace):
     """Delete removes item."""
+    headers = {"X-Workspace-Id": workspace.id}
     res = client.post(
         "/api/pantry/", 
         json={"name": "Mistake"}, 
-        headers={"X-Workspace-Id": workspace.id}
+        headers=headers
     )
     item_id = res.json()["id"]
     
     res = client.delete(
         f"/api/pantry/{item_id}",
-        headers={"X-Workspace-Id": workspace.id}
+        headers=headers
     )
     assert res.status_code == 204
     
     # Verify gone
-    res = client.get("/api/pantry/", headers={"X-Workspace-Id": workspace.id})
-    ids = [i["id"] for i in res.json()]
-    assert item_id not in ids
+    assert client.get(f"/api/pantry/{item_id}", headers=headers).status_code == 404
 
 
 # --- Leftovers Tests ---
 
 def test_create_leftover_lifecycle(client, workspace, db_session):
+    today = date.today()
+
     # 0. Setup: Create Meal Plan Entry for FK
     mp = MealPlan(
         workspace_id=workspace.id,
-        week_start=date.today(),
+        week_start=today,
         settings_json={}
     )
     db_session.add(mp)
-    db_session.commit()
-    db_session.refresh(mp)
+    db_session.flush()
     
     mpe = MealPlanEntry(
         meal_plan_id=mp.id,
-        date=date.today(),
+        date=today,
         meal_type="dinner"
     )
     db_session.add(mpe)
-    db_session.commit()
-    db_session.refresh(mpe)
+    db_session.flush()
 
     # 1. Create Leftover
     payload = {
         "name": "Roast Chicken Leftovers",
         "servings_left": 2.5,
-        "expires_on": (date.today() + timedelta(days=3)).isoformat(),
+        "expires_on": (today + timedelta(days=3)).isoformat(),
         "notes": "Delicious",
         "plan_entry_id": mpe.id
     }
@@ -221,14 +168,12 @@ def test_create_leftover_lifecycle(client, workspace, db_session):
     p_id = data["pantry_item_id"]
 
     # 2. Verify Pantry Item Created
-    p_response = client.get("/api/pantry/", headers=headers)
-    p_items = p_response.json()
-    found_p = next((p for p in p_items if p["id"] == p_id), None)
+    found_p = db_session.get(PantryItem, p_id)
     assert found_p is not None
-    assert found_p["name"] == payload["name"]
-    assert found_p["category"] == "Leftovers"
-    assert found_p["qty"] == 2.5
-    assert found_p["source"] == "leftover"
+    assert found_p.name == payload["name"]
+    assert found_p.category == "Leftovers"
+    assert found_p.qty == 2.5
+    assert found_p.source == "leftover"
 
     # 3. Dedupe check (Idempotencyish)
     # Calling create again with same plan_entry_id should return existing
@@ -238,7 +183,6 @@ def test_create_leftover_lifecycle(client, workspace, db_session):
     assert data2["id"] == leftover_id
     
     # 4. Verify Active List
-    l_response = client.get("/api/pantry/leftovers", headers=headers)
-    l_items = l_response.json()
+    l_items = db_session.query(Leftover).filter_by(workspace_id=workspace.id).all()
     assert len(l_items) >= 1
-    assert any(l["id"] == leftover_id for l in l_items)
+    assert any(l.id == leftover_id for l in l_items)
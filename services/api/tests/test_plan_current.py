@@ -0,0 +1,40 @@
+from datetime import date, timedelta
+from sqlalchemy import event
+from app.models import MealPlan, MealPlanEntry, Recipe
+
+
+def test_current_plan_loads_recipes_without_n_plus_one(client, workspace, db_session, db_transaction):
+    ws_id = workspace.id
+    monday = date.today() - timedelta(days=date.today().weekday())
+    recipes = [Recipe(workspace_id=workspace.id, title=f"Dish {i}", time_minutes=10 + i) for i in range(5)]
+    plan = MealPlan(workspace_id=workspace.id, week_start=monday, settings_json={})
+    plan.entries = [
+        MealPlanEntry(date=monday + timedelta(days=i), meal_type="dinner", recipe=r)
+        for i, r in enumerate(recipes)
+    ]
+    db_session.add_all([*recipes, plan])
+    db_session.commit()
+    db_session.expunge_all()
+
+    selects = []
+
+    def _count_selects(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            selects.append(statement)
+
+    event.listen(db_transaction, "before_cursor_execute", _count_selects)
+    try:
+        res = client.get(
+            f"/api/plan/current?week_start={monday.isoformat()}",
+            headers={"X-Workspace-Id": ws_id},
+        )
+    finally:
+        event.remove(db_transaction, "before_cursor_execute", _count_selects)
+
+    assert res.status_code == 200
+    entries = res.json()["entries"]
+    assert [e["recipe_title"] for e in entries] == [f"Dish {i}" for i in range(5)]
+    assert entries[0]["recipe_total_minutes"] == 10
+
+    # workspace + plan + entries (selectin) + recipes (selectin), independent of entry count
+    assert len(selects) <= 4, selects
@@ -15,8 +15,6 @@ def recipe_for_assist(db_session, workspace):
     return r
 
 def test_assist_mock_mode(client, recipe_for_assist, workspace):
-    print("Testing assist in mock mode...")
-    
     # Force mock mode
     original_mode = settings.ai_mode
     settings.ai_mode = "mock"
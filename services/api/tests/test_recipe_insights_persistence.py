@@ -1,7 +1,11 @@
 
 import pytest
-from unittest.mock import MagicMock, patch
+from types import SimpleNamespace
 from app.models import Recipe, RecipeMacroEntry, RecipeTipEntry
+from app.services.ai_service import AIService
+
+# Keep the module on one xdist worker so the module-scoped seed runs once
+pytestmark = pytest.mark.xdist_group("recipe_insights")
 
 # Helper to create a recipe
 def create_recipe(client):
@@ -21,28 +25,28 @@ def create_recipe(client):
     # Let's try to 'seed' first to ensure a recipe exists.
     return res
 
-def get_first_recipe_id(client):
-    # Seed to ensure we have data
+@pytest.fixture(scope="module")
+def seeded_recipe_id(client, db_connection):
+    """Seed once per module inside a savepoint that is rolled back afterwards.
+
+    /api/dev/seed is idempotent (it skips recipes that already exist), so
+    re-seeding on top of existing data is harmless.
+    """
+    savepoint = db_connection.begin_nested()
     client.post("/api/dev/seed")
-    # List recipes
     res = client.get("/api/recipes")
-    if res.status_code == 200 and len(res.json()) > 0:
-        return res.json()[0]["id"]
-    return None
+    yield res.json()[0]["id"] if res.status_code == 200 and res.json() else None
+    savepoint.rollback()
 
-def test_save_and_fetch_macros_manual(client):
+def test_save_and_fetch_macros_manual(client, seeded_recipe_id):
     """Test manually saving macros and fetching them back."""
-    recipe_id = get_first_recipe_id(client)
+    recipe_id = seeded_recipe_id
     assert recipe_id is not None, "Could not get a recipe ID"
 
     # 1. Verify initially empty or whatever default
-    import app.routers.recipes
-    print(f"DEBUG: recipes file is {app.routers.recipes.__file__}")
     res = client.get(f"/api/recipes/{recipe_id}/macros")
-    if res.status_code == 404:
-        print(client.get("/debug_routes").json())
     # It might return null if nothing saved, or 404? Implementation returns None (null in JSON)
-    assert res.status_code == 200
+    assert res.status_code == 200, f"macros endpoint missing on recipe {recipe_id}"
     
     # 2. Save macros
     payload = {
@@ -65,9 +69,9 @@ def test_save_and_fetch_macros_manual(client):
     assert fetched["source"] == "user"
     assert fetched["calories_max"] == 600
 
-def test_save_and_fetch_tips_manual(client):
+def test_save_and_fetch_tips_manual(client, seeded_recipe_id):
     """Test manually saving tips and fetching them back."""
-    recipe_id = get_first_recipe_id(client)
+    recipe_id = seeded_recipe_id
     assert recipe_id is not None
     
     scope = "storage"
@@ -98,19 +102,19 @@ def test_save_and_fetch_tips_manual(client):
     assert data["tips_json"][0] == "Store in airtight container"
     assert data["source"] == "user"
 
-@patch("app.services.ai_service.AIService.summarize_macros")
-def test_estimate_macros_persistence(mock_summarize, client):
+def test_estimate_macros_persistence(monkeypatch, client, seeded_recipe_id):
     """Test that estimating with persist=true saves the data with source=ai."""
-    recipe_id = get_first_recipe_id(client)
+    recipe_id = seeded_recipe_id
     assert recipe_id is not None
     
-    # Setup mock return
-    mock_result = MagicMock()
-    mock_result.source = "ai"
-    mock_result.confidence = "high"
-    mock_result.calories_range = {"min": 800, "max": 900}
-    mock_result.protein_range = {"min": 40, "max": 50}
-    mock_summarize.return_value = mock_result
+    # Setup stub return
+    estimate = SimpleNamespace(
+        source="ai",
+        confidence="high",
+        calories_range={"min": 800, "max": 900},
+        protein_range={"min": 40, "max": 50},
+    )
+    monkeypatch.setattr(AIService, "summarize_macros", lambda self, *args, **kwargs: estimate)
     
     # Call estimate with persist=true
     # Endpoint: POST /recipes/{id}/macros/estimate
@@ -128,20 +132,19 @@ def test_estimate_macros_persistence(mock_summarize, client):
     assert fetched["source"] == "ai"
     assert fetched["confidence"] == 0.9  # Logic maps "high" -> 0.9
 
-@patch("app.services.ai_service.AIService.generate_tips")
-def test_estimate_tips_heuristic(mock_generate, client):
+def test_estimate_tips_heuristic(monkeypatch, client, seeded_recipe_id):
     """Test that if AI service returns heuristic source, it is saved as such."""
-    recipe_id = get_first_recipe_id(client)
-    
-    # Setup mock to simulate AI failure falling back to heuristic (or just returning heuristic)
-    mock_result = MagicMock()
-    mock_result.source = "heuristic"
-    mock_result.confidence = "medium"
-    mock_result.tips = ["Generic tip 1"]
-    mock_result.food_safety = []
+    recipe_id = seeded_recipe_id
     
+    # Simulate AI failure falling back to heuristic (or just returning heuristic)
     # Note: method name in router is generate_tips
-    mock_generate.return_value = mock_result
+    tips = SimpleNamespace(
+        source="heuristic",
+        confidence="medium",
+        tips=["Generic tip 1"],
+        food_safety=[],
+    )
+    monkeypatch.setattr(AIService, "generate_tips", lambda self, *args, **kwargs: tips)
     
     scope = "reheat"
     res = client.post(f"/api/recipes/{recipe_id}/tips/estimate", json={"persist": True, "scope": scope})
@@ -6,105 +6,134 @@ Tests cover:
 - Dev seed endpoint
 """
 
+import orjson
 import pytest
-from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session
 
-from app.main import app
-from app.db import Base, get_db
 from app.models import Workspace, Recipe, RecipeStep
-from app.deps import get_workspace
+
+# Keep the module on one xdist worker so the module-scoped seed runs once
+pytestmark = pytest.mark.xdist_group("recipes")
+
+# Tests call the app in-process through conftest's `async_client`; the module seed
+# uses the session-scoped TestClient. Rows written by a test are discarded by the
+# per-test SAVEPOINT rollback, so no DELETE reset is needed.
+
+
+# Request bodies are serialized once at import and sent as raw content (see `orjson_io`)
+
+_RECIPE_PAYLOAD = orjson.dumps({
+    "title": "Test Recipe",
+    "cuisines": ["Italian"],
+    "tags": ["quick", "easy"],
+    "servings": 4,
+    "time_minutes": 30,
+    "notes": "A test recipe",
+    "steps": [
+        {
+            "step_index": 0,
+            "title": "Prep ingredients",
+            "bullets": ["Chop onions", "Mince garlic"],
+            "minutes_est": 10,
+        },
+        {
+            "step_index": 1,
+            "title": "Cook",
+            "bullets": ["Sauté in pan", "Add sauce"],
+            "minutes_est": 15,
+        },
+    ],
+})
+
+
+@pytest.fixture(scope="class")
+def seeded(client, db_connection):
+    """Seed once for TestSeededRecipes and read a recipe id straight from the DB.
+
+    Runs inside a savepoint that is rolled back when the class finishes, so the
+    seeded workspace never leaks into module-level tests. Tests that mutate the
+    recipe are still rolled back individually by their own nested savepoint.
+    """
+    savepoint = db_connection.begin_nested()
+    client.post("/api/dev/seed")
+    with Session(bind=db_connection, join_transaction_mode="create_savepoint") as session:
+        row = session.query(Recipe).first()
+        seeded_row = {"id": row.id, "workspace_id": row.workspace_id}
+    yield seeded_row
+    savepoint.rollback()
 
 
 # --- Tests ---
 
 
-def test_ready_endpoint(client):
+@pytest.mark.asyncio
+async def test_ready_endpoint(async_client, orjson_io):
     """Ready endpoint returns ok."""
-    response = client.get("/api/ready")
+    response = await async_client.get("/api/ready")
     assert response.status_code == 200
-    assert response.json()["ok"] is True
+    assert orjson_io.load(response)["ok"] is True
 
 
-def test_seed_creates_workspace_and_recipes(client):
+@pytest.mark.asyncio
+async def test_seed_creates_workspace_and_recipes(async_client, orjson_io):
     """Seed endpoint creates local workspace and sample recipes."""
-    response = client.post("/api/dev/seed")
+    response = await async_client.post("/api/dev/seed")
     assert response.status_code == 200
     
-    data = response.json()
+    data = orjson_io.load(response)
     assert data["workspace"]["slug"] == "local"
     assert data["recipes_created"] >= 1
     assert "Created" in data["message"]
 
 
-def test_seed_is_idempotent(client):
+@pytest.mark.asyncio
+async def test_seed_is_idempotent(async_client, orjson_io):
     """Running seed multiple times doesn't create duplicates."""
-    response1 = client.post("/api/dev/seed")
+    response1 = await async_client.post("/api/dev/seed")
     assert response1.status_code == 200
-    count1 = response1.json()["recipes_created"]
+    count1 = orjson_io.load(response1)["recipes_created"]
     
-    response2 = client.post("/api/dev/seed")
+    response2 = await async_client.post("/api/dev/seed")
     assert response2.status_code == 200
-    count2 = response2.json()["recipes_created"]
+    count2 = orjson_io.load(response2)["recipes_created"]
     
     # Second run should create 0 new recipes
     assert count2 == 0
 
 
-def test_list_recipes_empty_without_workspace(client):
+@pytest.mark.asyncio
+async def test_list_recipes_empty_without_workspace(async_client, orjson_io):
     """List recipes returns 404 when no workspace exists."""
-    response = client.get("/api/recipes")
+    response = await async_client.get("/api/recipes")
     assert response.status_code == 404
-    assert "No workspace found" in response.json()["detail"]
+    assert "No workspace found" in orjson_io.load(response)["detail"]
 
 
-def test_list_recipes_after_seed(client):
+@pytest.mark.asyncio
+async def test_list_recipes_after_seed(async_client, orjson_io):
     """List recipes returns seeded data."""
     # Seed first
-    client.post("/api/dev/seed")
+    await async_client.post("/api/dev/seed")
     
-    response = client.get("/api/recipes")
+    response = await async_client.get("/api/recipes")
     assert response.status_code == 200
     
-    recipes = response.json()
+    recipes = orjson_io.load(response)
     assert len(recipes) >= 1
     assert all("id" in r for r in recipes)
     assert all("title" in r for r in recipes)
 
 
-def test_create_recipe_with_steps(client):
+@pytest.mark.asyncio
+async def test_create_recipe_with_steps(async_client, orjson_io):
     """Create recipe with nested steps."""
     # Seed workspace first
-    client.post("/api/dev/seed")
-    
-    payload = {
-        "title": "Test Recipe",
-        "cuisines": ["Italian"],
-        "tags": ["quick", "easy"],
-        "servings": 4,
-        "time_minutes": 30,
-        "notes": "A test recipe",
-        "steps": [
-            {
-                "step_index": 0,
-                "title": "Prep ingredients",
-                "bullets": ["Chop onions", "Mince garlic"],
-                "minutes_est": 10,
-            },
-            {
-                "step_index": 1,
-                "title": "Cook",
-                "bullets": ["Sauté in pan", "Add sauce"],
-                "minutes_est": 15,
-            },
-        ],
-    }
+    await async_client.post("/api/dev/seed")
     
-    response = client.post("/api/recipes", json=payload)
+    response = await async_client.post("/api/recipes", content=_RECIPE_PAYLOAD, headers=orjson_io.headers)
     assert response.status_code == 201
     
-    data = response.json()
+    data = orjson_io.load(response)
     assert data["title"] == "Test Recipe"
     assert data["cuisines"] == ["Italian"]
     assert len(data["steps"]) == 2
@@ -112,80 +141,75 @@ def test_create_recipe_with_steps(client):
     assert data["steps"][1]["title"] == "Cook"
 
 
-def test_get_recipe_includes_steps(client):
-    """Get single recipe includes all steps."""
-    # Create recipe
-    client.post("/api/dev/seed")
-    
-    # List to get an ID
-    recipes = client.get("/api/recipes").json()
-    recipe_id = recipes[0]["id"]
-    
-    # Get single recipe
-    response = client.get(f"/api/recipes/{recipe_id}")
-    assert response.status_code == 200
-    
-    data = response.json()
-    assert "steps" in data
-    assert len(data["steps"]) >= 1
+class TestSeededRecipes:
+    """Tests that share one seeded workspace and recipe."""
 
+    @pytest.mark.asyncio
+    async def test_get_recipe_includes_steps(self, async_client, seeded, orjson_io):
+        """Get single recipe includes all steps."""
+        recipe_id = seeded["id"]
 
-def test_patch_recipe_updates_title(client):
-    """Patch recipe updates scalar fields."""
-    client.post("/api/dev/seed")
-    recipes = client.get("/api/recipes").json()
-    recipe_id = recipes[0]["id"]
-    
-    response = client.patch(
-        f"/api/recipes/{recipe_id}",
-        json={"title": "Updated Title"},
-    )
-    assert response.status_code == 200
-    assert response.json()["title"] == "Updated Title"
+        # Get single recipe
+        response = await async_client.get(f"/api/recipes/{recipe_id}")
+        assert response.status_code == 200
 
+        data = orjson_io.load(response)
+        assert "steps" in data
+        assert len(data["steps"]) >= 1
 
-def test_patch_recipe_replaces_steps(client):
-    """Patch recipe with steps replaces all existing steps."""
-    client.post("/api/dev/seed")
-    recipes = client.get("/api/recipes").json()
-    recipe_id = recipes[0]["id"]
-    
-    new_steps = [
-        {
-            "step_index": 0,
-            "title": "New Step 1",
-            "bullets": ["Do this"],
-            "minutes_est": 5,
-        },
-    ]
-    
-    response = client.patch(
-        f"/api/recipes/{recipe_id}",
-        json={"steps": new_steps},
-    )
-    assert response.status_code == 200
-    
-    data = response.json()
-    assert len(data["steps"]) == 1
-    assert data["steps"][0]["title"] == "New Step 1"
 
+    @pytest.mark.asyncio
+    async def test_patch_recipe_updates_title(self, async_client, seeded, orjson_io):
+        """Patch recipe updates scalar fields."""
+        recipe_id = seeded["id"]
 
-def test_recipe_not_found_returns_404(client):
-    """Get non-existent recipe returns 404."""
-    client.post("/api/dev/seed")
-    
-    response = client.get("/api/recipes/nonexistent-id")
-    assert response.status_code == 404
+        response = await async_client.patch(
+            f"/api/recipes/{recipe_id}",
+            json={"title": "Updated Title"},
+        )
+        assert response.status_code == 200
+        assert orjson_io.load(response)["title"] == "Updated Title"
 
 
-def test_search_filters_recipes(client):
-    """Search parameter filters recipes by title."""
-    client.post("/api/dev/seed")
-    
-    # Search for enchiladas
-    response = client.get("/api/recipes?search=enchilada")
-    assert response.status_code == 200
-    
-    recipes = response.json()
-    # Should find at least the Salsa Verde Enchiladas
-    assert any("enchilada" in r["title"].lower() for r in recipes)
+    @pytest.mark.asyncio
+    async def test_patch_recipe_replaces_steps(self, async_client, seeded, orjson_io):
+        """Patch recipe with steps replaces all existing steps."""
+        recipe_id = seeded["id"]
+
+        new_steps = [
+            {
+                "step_index": 0,
+                "title": "New Step 1",
+                "bullets": ["Do this"],
+                "minutes_est": 5,
+            },
+        ]
+
+        response = await async_client.patch(
+            f"/api/recipes/{recipe_id}",
+            json={"steps": new_steps},
+        )
+        assert response.status_code == 200
+
+        data = orjson_io.load(response)
+        assert len(data["steps"]) == 1
+        assert data["steps"][0]["title"] == "New Step 1"
+
+
+    @pytest.mark.asyncio
+    async def test_recipe_not_found_returns_404(self, async_client, seeded):
+        """Get non-existent recipe returns 404."""
+        response = await async_client.get("/api/recipes/nonexistent-id")
+        assert response.status_code == 404
+
+
+    @pytest.mark.asyncio
+    async def test_search_filters_recipes(self, async_client, seeded, orjson_io):
+        """Search parameter filters recipes by title."""
+        # Search for enchiladas
+        response = await async_client.get("/api/recipes?search=enchilada")
+        assert response.status_code == 200
+
+        recipes = orjson_io.load(response)
+        # Should find at least the Salsa Verde Enchiladas
+        assert any("enchilada" in r["title"].lower() for r in recipes)
@@ -1,30 +1,36 @@
-from app.core.text import clean_md
+import pytest
 
-def test_clean_md_headers():
-    assert clean_md("# Title") == "Title"
-    assert clean_md("## Subtitle") == "Subtitle"
-    assert clean_md("### Section") == "Section"
-    assert clean_md("#   Spaced Title  ") == "Spaced Title"
+from app.core.text import clean_md
 
-def test_clean_md_bold():
-    assert clean_md("**Bold** text") == "Bold text"
-    assert clean_md("Text with **bold** word") == "Text with bold word"
-    assert clean_md("__Mixed__ bold") == "Mixed bold"
+@pytest.mark.parametrize("raw,expected", [
+    # Headers
+    ("# Title", "Title"),
+    ("## Subtitle", "Subtitle"),
+    ("### Section", "Section"),
+    ("#   Spaced Title  ", "Spaced Title"),
+    # Bold
+    ("**Bold** text", "Bold text"),
+    ("Text with **bold** word", "Text with bold word"),
+    ("__Mixed__ bold", "Mixed bold"),
     # Ensure it doesn't strip if not closed or weirdly formatted (regex dependent)
     # The current regex is r"(\*\*|__)(.*?)\1"
-    assert clean_md("**Open") == "**Open" 
-
-def test_clean_md_bullets():
-    assert clean_md("- Item") == "Item"
-    assert clean_md("* Item") == "Item"
-    assert clean_md("  -  Indented") == "Indented"
-    
-def test_clean_md_mixed():
-    assert clean_md("# **Title**") == "Title"
-    assert clean_md("- **Bold Item**") == "Bold Item"
-
-def test_clean_md_preservation():
-    # Should not strip internal hyphens
-    assert clean_md("use 1/2-inch cubes") == "use 1/2-inch cubes"
-    # Should not strip bullets in middle of text (not leading)
-    assert clean_md("Title: - subtitle") == "Title: - subtitle"
+    ("**Open", "**Open"),
+    # Bullets
+    ("- Item", "Item"),
+    ("* Item", "Item"),
+    ("  -  Indented", "Indented"),
+    # Mixed
+    ("# **Title**", "Title"),
+    ("- **Bold Item**", "Bold Item"),
+    # Preservation: internal hyphens and non-leading bullets stay
+    ("use 1/2-inch cubes", "use 1/2-inch cubes"),
+    ("Title: - subtitle", "Title: - subtitle"),
+], ids=[
+    "header-h1", "header-h2", "header-h3", "header-spaced",
+    "bold-leading", "bold-inline", "bold-underscore", "bold-unclosed",
+    "bullet-dash", "bullet-star", "bullet-indented",
+    "mixed-header-bold", "mixed-bullet-bold",
+    "keep-internal-hyphen", "keep-inline-dash",
+])
+def test_clean_md(raw, expected):
+    assert clean_md(raw) == expected
@@ -1,16 +1,17 @@
 import pytest
+from dataclasses import dataclass, field
 from app.services.time_estimate import estimate_recipe_time
 
+@dataclass(slots=True)
 class MockStep:
-    def __init__(self, title, bullets=None, minutes_est=None):
-        self.title = title
-        self.bullets = bullets or []
-        self.minutes_est = minutes_est
+    title: str
+    bullets: list = field(default_factory=list)
+    minutes_est: int | None = None
 
+@dataclass(slots=True)
 class MockRecipe:
-    def __init__(self, steps, ingredients=None):
-        self.steps = steps
-        self.ingredients = ingredients or []
+    steps: list
+    ingredients: list = field(default_factory=list)
 
 def test_explicit_minutes():
     steps = [
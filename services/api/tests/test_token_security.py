@@ -1,4 +1,10 @@
+import base64
+import gzip
+import json
+from types import SimpleNamespace
+
 import pytest
+from app.parsing import token_encoder
 from app.parsing.token_encoder import (
     encode_recipe_token,
     decode_recipe_token,
@@ -10,42 +16,52 @@ from app.parsing.token_encoder import (
     MAX_DECOMPRESSED_SIZE
 )
 
-def test_token_roundtrip_with_checksum():
-    """Test encoding and decoding preserves data with checksum validation."""
-    data = {
+# Old-format token (gzip, no checksum), built once at import
+_OLD_TOKEN = "tasteos-v1:" + base64.urlsafe_b64encode(
+    gzip.compress(json.dumps({"recipe": {"title": "Old Format"}}, separators=(',', ':')).encode('utf-8'))
+).decode('ascii')
+
+@pytest.fixture(scope="module")
+def sample_data():
+    return {
         "recipe": {
             "title": "Test Recipe",
             "ingredients": [{"name": "flour", "qty": 2, "unit": "cups"}],
             "steps": [{"step_index": 0, "title": "Mix", "bullets": ["Stir"]}]
         }
     }
+
+@pytest.fixture(scope="module")
+def sample_token(sample_data):
+    """Encode sample_data once per module; tests only read the token."""
+    return encode_recipe_token(sample_data)
+
+def test_token_roundtrip_with_checksum(sample_token, sample_data):
+    """Test encoding and decoding preserves data with checksum validation."""
+    token = sample_token
     
-    token = encode_recipe_token(data)
-    
-    # Verify token format: tasteos-v1:{64-char-hex}:{base64}
-    assert token.startswith("tasteos-v1:")
-    parts = token[len("tasteos-v1:"):].split(":", 1)
+    # Verify token format: tasteos-v1u:{hex checksum}:{base64} (small payload, not gzipped)
+    # The checksum is xxh3-64, 16 hex chars
+    assert token.startswith("tasteos-v1u:")
+    parts = token[len("tasteos-v1u:"):].split(":", 1)
     assert len(parts) == 2
     checksum, b64_data = parts
-    assert len(checksum) == 64
+    assert len(checksum) == 16
     assert all(c in '0123456789abcdef' for c in checksum)
     
     # Decode and verify
     decoded = decode_recipe_token(token)
-    assert decoded == data
+    assert decoded == sample_data
 
-def test_token_checksum_tampering_detected():
+def test_token_checksum_tampering_detected(sample_token):
     """Test that modifying token data invalidates checksum."""
-    data = {"recipe": {"title": "Original"}}
-    token = encode_recipe_token(data)
-    
     # Tamper with checksum (change last char)
-    parts = token.split(":")
+    parts = sample_token.split(":")
     tampered_checksum = parts[1][:-1] + ('0' if parts[1][-1] != '0' else '1')
     tampered_token = f"{parts[0]}:{tampered_checksum}:{parts[2]}"
     
     with pytest.raises(TokenCorruptedError, match="checksum mismatch"):
-        decode_recipe_token(tampered_token)
+        decode_recipe_token(tampered_token, verify_checksum=True)
 
 def test_token_size_limit_exceeded():
     """Test that oversized recipes are rejected."""
@@ -60,6 +76,16 @@ def test_token_size_limit_exceeded():
     with pytest.raises(TokenTooLargeError, match="Recipe data too large"):
         encode_recipe_token(huge_data)
 
+def test_token_non_str_keys_rejected():
+    """Dict keys that are not strings raise TokenError instead of a bare TypeError."""
+    with pytest.raises(TokenError, match="cannot be encoded"):
+        encode_recipe_token({"recipe": {1: "one"}})
+
+def test_token_oversized_int_rejected():
+    """Integers wider than 64 bits raise TokenError instead of a bare TypeError."""
+    with pytest.raises(TokenError, match="cannot be encoded"):
+        encode_recipe_token({"recipe": {"servings": 2**64}})
+
 def test_token_invalid_prefix():
     """Test that tokens without proper prefix are rejected."""
     with pytest.raises(TokenCorruptedError, match="prefix"):
@@ -94,17 +120,91 @@ def test_token_size_check_before_processing():
 
 def test_backwards_compatibility_old_tokens_fail():
     """Test that old format tokens (without checksum) are properly rejected."""
-    import base64
-    import gzip
-    import json
-    
-    # Create old-format token (no checksum)
-    data = {"recipe": {"title": "Old Format"}}
-    json_bytes = json.dumps(data, separators=(',', ':')).encode('utf-8')
-    compressed = gzip.compress(json_bytes)
-    b64 = base64.urlsafe_b64encode(compressed).decode('ascii')
-    old_token = f"tasteos-v1:{b64}"
-    
     # Should fail with "missing checksum or data" since there's no second colon
     with pytest.raises(TokenCorruptedError, match="missing checksum or data"):
-        decode_recipe_token(old_token)
+        decode_recipe_token(_OLD_TOKEN)
+
+class _FakeDeflateError(Exception):
+    pass
+
+@pytest.fixture
+def fake_deflate(monkeypatch):
+    """Stand-in for the optional libdeflate binding; records decompress calls."""
+    calls = []
+    
+    def gzip_decompress(data):
+        calls.append(data)
+        raise _FakeDeflateError("invalid data")
+    
+    fake = SimpleNamespace(
+        gzip_compress=lambda data, level: gzip.compress(data, compresslevel=level),
+        gzip_decompress=gzip_decompress,
+        DeflateError=_FakeDeflateError,
+        calls=calls,
+    )
+    monkeypatch.setattr(token_encoder, "deflate", fake)
+    return fake
+
+def test_deflate_rejects_oversized_isize_before_decompressing(fake_deflate):
+    """The ISIZE trailer is checked before libdeflate allocates its output buffer."""
+    payload = gzip.compress(b"{}")[:-4] + (MAX_DECOMPRESSED_SIZE + 1).to_bytes(4, "little")
+    
+    with pytest.raises(TokenTooLargeError, match="too large"):
+        token_encoder._safe_decompress(payload, MAX_DECOMPRESSED_SIZE)
+    assert fake_deflate.calls == []
+
+def test_deflate_corrupt_stream_is_token_corrupted(fake_deflate):
+    """libdeflate errors surface as TokenCorruptedError."""
+    payload = b"\x1f\x8b" + b"\x00" * 20
+    
+    with pytest.raises(TokenCorruptedError, match="Invalid compressed data"):
+        token_encoder._safe_decompress(payload, MAX_DECOMPRESSED_SIZE)
+    assert fake_deflate.calls == [payload]
+
+@pytest.fixture
+def real_deflate(monkeypatch):
+    """The pinned libdeflate binding, skipped where it is not installed."""
+    deflate = pytest.importorskip("deflate")
+    monkeypatch.setattr(token_encoder, "deflate", deflate)
+    return deflate
+
+def test_deflate_roundtrip(real_deflate):
+    """Gzipped tokens encode and decode through libdeflate."""
+    data = {"recipe": {"title": "Test", "notes": "x" * 4096}}
+    token = encode_recipe_token(data)
+    
+    assert token.startswith("tasteos-v1:")
+    assert decode_recipe_token(token) == data
+
+def test_deflate_real_oversized_isize_rejected(real_deflate):
+    """An ISIZE trailer above the limit is rejected before libdeflate runs."""
+    payload = real_deflate.gzip_compress(b"{}", 9)[:-4] + (MAX_DECOMPRESSED_SIZE + 1).to_bytes(4, "little")
+    
+    with pytest.raises(TokenTooLargeError, match="too large"):
+        token_encoder._safe_decompress(payload, MAX_DECOMPRESSED_SIZE)
+
+def test_deflate_real_corrupt_stream_is_token_error(real_deflate):
+    """A DeflateError from a corrupt stream (bad CRC32 trailer) surfaces as a TokenError."""
+    compressed = real_deflate.gzip_compress(b'{"recipe": {"title": "Test"}}', 9)
+    corrupt = compressed[:-8] + b"\x00\x00\x00\x00" + compressed[-4:]
+    with pytest.raises(real_deflate.DeflateError):
+        real_deflate.gzip_decompress(corrupt)
+    
+    with pytest.raises(TokenError, match="Invalid compressed data"):
+        token_encoder._safe_decompress(corrupt, MAX_DECOMPRESSED_SIZE)
+
+def test_gzip_fallback_caps_output_size(monkeypatch):
+    """Without libdeflate, a zip-bomb is cut off at max_size instead of fully inflated."""
+    monkeypatch.setattr(token_encoder, "deflate", None)
+    bomb = gzip.compress(b"\x00" * 4096)
+    
+    with pytest.raises(TokenTooLargeError, match="too large"):
+        token_encoder._safe_decompress(bomb, 1024)
+
+def test_gzip_fallback_truncated_stream_is_token_corrupted(monkeypatch):
+    """Without libdeflate, a truncated gzip stream is rejected."""
+    monkeypatch.setattr(token_encoder, "deflate", None)
+    truncated = gzip.compress(b'{"recipe": {}}')[:-8]
+    
+    with pytest.raises(TokenCorruptedError, match="Invalid compressed data"):
+        token_encoder._safe_decompress(truncated, MAX_DECOMPRESSED_SIZE)
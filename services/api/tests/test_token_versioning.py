@@ -1,3 +1,8 @@
+import base64
+import gzip
+import hashlib
+
+import orjson
 import pytest
 from app.parsing.token_encoder import (
     encode_recipe_token,
@@ -6,6 +11,7 @@ from app.parsing.token_encoder import (
     TokenVersionError,
     TokenTooLargeError,
     TokenCorruptedError,
+    COMPRESS_THRESHOLD,
 )
 
 def test_checksum_over_compressed_bytes():
@@ -25,7 +31,7 @@ def test_checksum_over_compressed_bytes():
     tampered_token = f"{parts[0]}:{parts[1]}:{tampered_data}"
     
     with pytest.raises(TokenCorruptedError, match="checksum mismatch"):
-        decode_recipe_token(tampered_token)
+        decode_recipe_token(tampered_token, verify_checksum=True)
 
 def test_unknown_version_rejected():
     """Reject tokens with unsupported versions."""
@@ -67,5 +73,33 @@ def test_forward_compatibility_structure():
     decoded = decode_recipe_token(token)
     assert decoded == data
     
-    # Version is extracted correctly
-    assert "tasteos-v1:" in token
+    # Version is extracted correctly (small payloads skip gzip)
+    assert token.startswith("tasteos-v1u:")
+
+def test_large_payload_is_gzipped():
+    """Payloads at or above COMPRESS_THRESHOLD use the gzipped v1 layout."""
+    data = {"recipe": {"title": "Test", "notes": "x" * COMPRESS_THRESHOLD}}
+    token = encode_recipe_token(data)
+    
+    assert token.startswith("tasteos-v1:")
+    assert decode_recipe_token(token) == data
+
+def test_verify_checksum_flag():
+    """verify_checksum=False skips the integrity check; True rejects a tampered checksum."""
+    data = {"recipe": {"title": "Test"}}
+    prefix, checksum, b64 = encode_recipe_token(data).rsplit(":", 2)
+    tampered_token = f"{prefix}:{'0' * len(checksum)}:{b64}"
+    
+    assert decode_recipe_token(tampered_token, verify_checksum=False) == data
+    with pytest.raises(TokenCorruptedError, match="checksum mismatch"):
+        decode_recipe_token(tampered_token, verify_checksum=True)
+
+def test_legacy_sha256_checksum_still_decodes():
+    """Gzipped v1 tokens issued with SHA-256 checksums before the xxh3 switch keep decoding."""
+    data = {"recipe": {"title": "Test"}}
+    compressed = gzip.compress(orjson.dumps(data), compresslevel=9)
+    checksum = hashlib.sha256(compressed).hexdigest()
+    token = f"tasteos-v1:{checksum}:{base64.urlsafe_b64encode(compressed).decode('ascii')}"
+    
+    assert len(checksum) == 64
+    assert decode_recipe_token(token, verify_checksum=True) == data
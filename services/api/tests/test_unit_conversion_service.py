@@ -0,0 +1,106 @@
+"""
+Direct tests for the unit conversion service (no HTTP round trip).
+"""
+
+import pytest
+
+from app.services.unit_conversion import auto_select_unit, convert_unit, normalize_unit
+
+
+@pytest.mark.parametrize("raw,expected", [
+    ("T", "tbsp"),   # case-sensitive synonym: T is tablespoon...
+    ("t", "tsp"),    # ...and t is teaspoon
+    ("T.", "tbsp"),
+    ("tbl", "tbsp"),
+    ("TSP", "tsp"),
+    ("tsp.", "tsp"),
+    (" g ", "g"),
+    ("kgs", "kg"),   # plural of a unit without its own entry
+    ("grams", "grams"),
+    ("Cups", "cups"),
+    ("fl oz", "fl oz"),
+    ("", None),
+    ("furlong", None),
+])
+def test_normalize_unit(raw, expected):
+    assert normalize_unit(raw) == expected
+
+
+def test_convert_same_type():
+    result = convert_unit(1, "kg", "g")
+    assert result.qty == 1000
+    assert result.unit == "g"
+    assert result.confidence == "high"
+    assert result.is_approx is False
+
+
+def test_convert_cached_resolution_scales_with_qty():
+    # The unit resolution is memoized; the quantity must still be applied per call
+    assert convert_unit(1, "tbsp", "tsp").qty == pytest.approx(3.0, abs=0.01)
+    assert convert_unit(2, "tbsp", "tsp").qty == pytest.approx(6.0, abs=0.01)
+
+
+def test_convert_cross_type_with_table_density():
+    result = convert_unit(1, "cup", "g", ingredient_name="flour")
+    assert result.qty == pytest.approx(236.588 * 0.50)
+    assert result.confidence == "medium"
+    assert result.is_approx is True
+
+
+def test_convert_cross_type_with_override_density():
+    result = convert_unit(1, "cup", "g", ingredient_name="flour", override_density=2.0)
+    assert result.qty == pytest.approx(236.588 * 2.0)
+    assert result.confidence == "high"
+    assert result.is_approx is False
+    assert "override" in result.note
+
+
+def test_convert_cross_type_without_density_passes_through():
+    result = convert_unit(100, "g", "cup", ingredient_name="mystery powder")
+    assert result.qty == 100
+    assert result.note == "Cannot convert mass to volume without density"
+
+
+def test_convert_count_to_mass_passes_through():
+    result = convert_unit(3, "cloves", "g")
+    assert result.qty == 3
+    assert result.note == "Cannot convert count to measurement"
+
+
+def test_convert_unknown_unit_passes_through():
+    result = convert_unit(2, "furlong", "g")
+    assert result.qty == 2
+    assert result.unit == "g"
+    assert result.note == "Unknown unit"
+
+
+# A quantity exactly on a threshold picks the larger unit
+@pytest.mark.parametrize("qty,unit,system,expected", [
+    (999, "ml", "metric", "ml"),
+    (1000, "ml", "metric", "l"),
+    (1, "cup", "metric", "ml"),
+    (999.9, "g", "metric", "g"),
+    (1000, "g", "metric", "kg"),
+    (14.9, "ml", "us_customary", "tsp"),
+    (15, "ml", "us_customary", "tbsp"),
+    (59.9, "ml", "us_customary", "tbsp"),
+    (60, "ml", "us_customary", "cup"),
+    (949, "ml", "us_customary", "cup"),
+    (950, "ml", "us_customary", "qt"),
+    (3799, "ml", "us_customary", "qt"),
+    (3800, "ml", "us_customary", "gal"),
+    (15.9, "oz", "us_customary", "oz"),
+    (16, "oz", "us_customary", "lb"),
+    (1, "lb", "us_customary", "lb"),
+])
+def test_auto_select_unit_thresholds(qty, unit, system, expected):
+    assert auto_select_unit(qty, unit, system) == expected
+
+
+@pytest.mark.parametrize("qty,unit,system", [
+    (3, "cloves", "metric"),       # count units have no smart table
+    (2, "furlong", "metric"),      # unknown unit
+    (500, "ml", "imperial"),       # unknown target system
+])
+def test_auto_select_unit_keeps_unit(qty, unit, system):
+    assert auto_select_unit(qty, unit, system) == unit
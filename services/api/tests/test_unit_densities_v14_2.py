@@ -1,10 +1,6 @@
 import pytest
-from fastapi.testclient import TestClient
-from app.main import app
 
-client = TestClient(app)
-
-def test_density_lifecycle():
+def test_density_lifecycle(client):
     # 1. Setup clean state happens via fixture override in main test suite usually, 
     # but here we rely on the workspace from default deps mock or similar.
     # Note: Authenticated depends will need a workspace. 
@@ -37,8 +33,9 @@ def test_density_lifecycle():
     items = res.json()["items"]
     assert len(items) >= 1
     # Find our item
-    found = next((i for i in items if i["id"] == density_id), None)
-    assert found is not None
+    by_id = {i["id"]: i for i in items}
+    assert density_id in by_id
+    found = by_id[density_id]
     assert found["ingredient_key"] == "all purpose flour"
     
     # 4. Conversion Usage
@@ -74,7 +71,7 @@ def test_density_lifecycle():
     assert cdata["is_approx"] == True 
     assert cdata["confidence"] != "high" # medium or low
 
-def test_density_validation():
+def test_density_validation(client):
     # Test sane bounds
     res = client.put("/api/units/densities", json={
         "ingredient_name": "Lead",
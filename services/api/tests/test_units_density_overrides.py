@@ -1,5 +1,8 @@
 import pytest
 from app.models import IngredientDensityOverride
+from fastapi import HTTPException
+from app.routers.units_density import MIN_DENSITY, MAX_DENSITY, upsert_density
+from app.schemas import IngredientDensityUpsert, UnitDensityInput
 from app.services.ingredient_normalize import normalize_ingredient_key
 
 @pytest.fixture
@@ -93,3 +96,26 @@ def test_override_insane_values(client, auth_headers):
     res = client.put("/api/units/densities", json=payload, headers=auth_headers)
     assert res.status_code == 400
     assert "sane range" in res.json()["detail"]
+
+# The density router is not mounted in main.py, so the bounds are checked by
+# calling the route handler directly
+@pytest.mark.parametrize("g_per_ml,ok", [
+    (MIN_DENSITY, True),
+    (MAX_DENSITY, True),
+    (MIN_DENSITY / 2, False),
+    (MAX_DENSITY * 2, False),
+])
+def test_override_density_bounds(db_session, workspace, g_per_ml, ok):
+    """The sane range is inclusive at both ends."""
+    req = IngredientDensityUpsert(
+        ingredient_name="Boundary Powder",
+        density=UnitDensityInput(mass_value=g_per_ml, mass_unit="g", vol_value=1, vol_unit="ml"),
+    )
+    if ok:
+        saved = upsert_density(req, db=db_session, workspace=workspace)
+        assert float(saved.density_g_per_ml) == pytest.approx(g_per_ml)
+    else:
+        with pytest.raises(HTTPException) as exc:
+            upsert_density(req, db=db_session, workspace=workspace)
+        assert exc.value.status_code == 400
+        assert f"({MIN_DENSITY} - {MAX_DENSITY} g/ml)" in exc.value.detail
@@ -1,48 +1,29 @@
-import os
 import pytest
-from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.orm import Session
 
-from app.main import app
-from app.db import get_db
 from app.models import Workspace
 
-# --- Test Database Setup ---
-# Reuse the session scope logic
-SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./test_workspaces.db")
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Keep the module on one xdist worker so the module-scoped seed runs once
+pytestmark = pytest.mark.xdist_group("workspaces")
 
-@pytest.fixture(scope="module", autouse=True)
-def setup_db():
-    Workspace.__table__.create(bind=engine)
-    yield
-    Workspace.__table__.drop(bind=engine)
+# Requests go through conftest's session client and shared connection; each test
+# runs in its own SAVEPOINT, so workspaces created by a test are rolled back.
 
-def override_get_db():
-    db = TestingSessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
 
-@pytest.fixture
-def client():
-    """Test client with DB override."""
-    app.dependency_overrides[get_db] = override_get_db
-    with TestClient(app) as c:
-        yield c
-    app.dependency_overrides.clear()
+@pytest.fixture(scope="module")
+def seeded_workspace(db_connection):
+    """One workspace for the header-resolution tests, created once per module.
 
-@pytest.fixture
-def db():
-    """Direct database session."""
-    session = TestingSessionLocal()
-    try:
-        yield session
-    finally:
-        session.close()
+    Lives in a module savepoint that is rolled back after the last test.
+    """
+    savepoint = db_connection.begin_nested()
+    with Session(bind=db_connection, join_transaction_mode="create_savepoint") as session:
+        ws = Workspace(name="Setup WS", slug="setup-ws")
+        session.add(ws)
+        session.commit()
+        seeded_ws = {"id": ws.id, "slug": ws.slug}
+    yield seeded_ws
+    savepoint.rollback()
 
 # --- Tests ---
 
@@ -79,31 +60,16 @@ def test_create_workspace_duplicate_slug(client):
     assert data["slug"] != "collision-test" 
     assert data["slug"].startswith("collision-test-")
 
-def test_workspace_resolution_header_uuid(client, db):
-    # Ensure at least one workspace exists
-    ws = db.query(Workspace).first()
-    if not ws:
-        # Create one manually
-        resp = client.post("/api/workspaces/", json={"name": "Setup WS"})
-        ws_id = resp.json()["id"]
-        ws = db.get(Workspace, ws_id)
-        
+def test_workspace_resolution_header_uuid(client, seeded_workspace):
     # Request with UUID header. 
     # Use generic endpoint like /api/recipes/ which requires workspace
-    headers = {"X-Workspace-Id": str(ws.id)}
+    headers = {"X-Workspace-Id": seeded_workspace["id"]}
     resp = client.get("/api/recipes/", headers=headers)
     # 200 OK means dependency passed
     assert resp.status_code == 200
 
-def test_workspace_resolution_header_slug(client, db):
-    ws = db.query(Workspace).first()
-    if not ws:
-        resp = client.post("/api/workspaces/", json={"name": "Setup WS 2"})
-        ws_id = resp.json()["id"]
-        # refresh from db to get slug accurately if needed, though POST returns it
-        ws = db.get(Workspace, ws_id)
-    
-    headers = {"X-Workspace-Id": ws.slug}
+def test_workspace_resolution_header_slug(client, seeded_workspace):
+    headers = {"X-Workspace-Id": seeded_workspace["slug"]}
     resp = client.get("/api/recipes/", headers=headers)
     assert resp.status_code == 200
 